@@ -1,6 +1,7 @@
 import streamlit as st
 import os
-from data_collection import collect_data
+from circuit_breaker import breaker_states
+from data_collection import collect_data, load_data_from_json
 from data_analysis import analyze_data
 from battlecard_generation import generate_battlecards
 from battlecard_design import design_battlecards, TEMPLATES
@@ -48,15 +49,24 @@ def show_collect_analyze_generate_page():
 
             # Call the collect_data function with the inputs
             collect_data(competitor_names_list, industry_keywords_list)
+            report = load_data_from_json('collection_report.json') or {}
+            if report.get('missing_queries'):
+                st.warning(f"No new results (deadline of {report['deadline_seconds']:.0f}s or NewsAPI unavailable) "
+                           f"for: {', '.join(report['missing_queries'])}")
             
             # Call the analyze_data function
             analyze_data()
             
             # Call the generate_battlecards function
-            generate_battlecards()
+            battlecards = generate_battlecards()
             
-            # Display success message
-            st.success("Data collected, analyzed, and battlecards generated successfully!")
+            # Display success message, or what was left out of a degraded run
+            skipped = [name for name in competitor_names_list if name not in battlecards]
+            if skipped:
+                st.warning(f"Battlecards generated for {len(battlecards)} of {len(competitor_names_list)} "
+                           f"competitors; skipped: {', '.join(skipped)}")
+            else:
+                st.success("Data collected, analyzed, and battlecards generated successfully!")
         else:
             st.error("Please fill out all fields.")
 
@@ -95,10 +105,25 @@ def show_design_battlecards_page():
                     file_name=file
                 )
 
+# Sidebar status of the external services, from their circuit breakers
+def show_service_status():
+    states = breaker_states()
+    if not states:
+        return
+    st.sidebar.subheader("Service status")
+    for name, state in states.items():
+        if state['state'] == 'closed':
+            st.sidebar.write(f"{name}: available")
+        elif state['state'] == 'half_open':
+            st.sidebar.write(f"{name}: recovering (next call probes it)")
+        else:
+            st.sidebar.write(f"{name}: unavailable, retrying in {state['retry_in_seconds']:.0f}s")
+
 # Streamlit page selection
 def main():
     st.sidebar.title("Navigation")
     page = st.sidebar.radio("Select a page", ["Collect, Analyze, and Generate Battlecards", "Design Battlecards"])
+    show_service_status()
 
     if page == "Collect, Analyze, and Generate Battlecards":
         show_collect_analyze_generate_page()
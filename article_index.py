@@ -0,0 +1,104 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the referrer and never change the article
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ocid', 'cmpid', 'ref', 'smid'}
+
+# Text fields the content hash covers
+HASH_FIELDS = ('title', 'description', 'content')
+
+
+# Normalize a URL so the same article reached through different links compares equal
+def canonical_url(url):
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    ))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme, host, path, query, ''))
+
+
+# Hash of the normalized text fields, catching copies published under another URL
+def content_hash(article):
+    text = '\x1f'.join(
+        ' '.join((article.get(field) or '').split()).casefold()
+        for field in HASH_FIELDS
+    )
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+# Stable ID for an article, derived from its canonical URL or, failing that, its content
+def article_id(article):
+    url = canonical_url(article.get('url'))
+    if url:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    return content_hash(article)[:16]
+
+
+class ArticleIndex:
+    """Deduplicates articles across queries by canonical URL and content hash.
+
+    Each unique article is stored once under a shared ID; adding a duplicate
+    returns the ID of the copy seen first.
+    """
+
+    def __init__(self):
+        self.articles = {}
+        self.aliases = {}  # IDs of dropped near-duplicates -> their representative
+        self._by_url = {}
+        self._by_hash = {}
+        self._loaded = 0
+        self.seen = 0
+
+    # Register articles stored by an earlier run under their existing IDs
+    def load(self, articles, aliases=None):
+        self.aliases.update(aliases or {})
+        self._loaded += len(articles)
+        for i, article in articles.items():
+            self.articles[i] = article
+            url = canonical_url(article.get('url'))
+            if url:
+                self._by_url.setdefault(url, i)
+            self._by_hash.setdefault(content_hash(article), i)
+
+    def add(self, article):
+        self.seen += 1
+        url = canonical_url(article.get('url'))
+        digest = content_hash(article)
+        existing = self._by_url.get(url) if url else None
+        existing = existing or self._by_hash.get(digest)
+        if existing is None:
+            existing = article_id(article)
+            existing = self.aliases.get(existing, existing)
+            if existing not in self.articles:
+                self.articles[existing] = article
+        if url:
+            self._by_url.setdefault(url, existing)
+        self._by_hash.setdefault(digest, existing)
+        return existing
+
+    def add_many(self, articles):
+        return [self.add(article) for article in articles]
+
+    # Point the IDs of dropped near-duplicates at their representative
+    def add_aliases(self, representative):
+        self.aliases.update((i, rep) for i, rep in representative.items() if i != rep)
+        for i, rep in self.aliases.items():
+            while rep in self.aliases and self.aliases[rep] != rep:
+                rep = self.aliases[rep]
+            self.aliases[i] = rep
+
+    def stats(self):
+        unique = len(self.articles) - self._loaded
+        return {
+            'articles_seen': self.seen,
+            'unique_articles': unique,
+            'duplicates': self.seen - unique,
+            'dedup_ratio': round(1 - unique / self.seen, 4) if self.seen else 0.0
+        }
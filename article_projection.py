@@ -0,0 +1,31 @@
+import sys
+
+# Fields whose values repeat across many articles and are interned: second-resolution timestamps,
+# shared by articles published together and by every query returning an article, and, when a
+# projection keeps them, source names and bylines
+INTERNED_FIELDS = ('publishedAt', 'source', 'author')
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(k): _intern(v) for k, v in value.items()}
+    return value
+
+
+# Copy of an article with only `fields`; keys come from `fields`, so every copy shares the same key objects
+def project_article(article, fields):
+    projected = {}
+    for field in fields:
+        if field in article:
+            value = article[field]
+            projected[field] = _intern(value) if field in INTERNED_FIELDS else value
+    return projected
+
+
+# NewsAPI response with its articles projected onto `fields` (None keeps them whole)
+def project_response(news_data, fields):
+    if fields is None or not isinstance(news_data.get('articles'), list):
+        return news_data
+    return {**news_data, 'articles': [project_article(article, fields) for article in news_data['articles']]}
@@ -0,0 +1,317 @@
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from article_index import ArticleIndex
+from near_duplicates import band_keys
+
+STORE_PATH = os.path.join('output', 'articles.db')
+LEGACY_COLLECTED_PATH = os.path.join('output', 'collected_data.json')
+LEGACY_ORGANIZED_PATH = os.path.join('output', 'organized_details.json')
+
+# Article fields kept in their own columns; anything else goes to the extra JSON column
+ARTICLE_COLUMNS = {'url': 'url', 'publishedAt': 'published_at', 'title': 'title',
+                   'description': 'description', 'content': 'content', 'cluster_size': 'cluster_size'}
+# Fields read from other tables; only returned when asked for by name
+JOINED_FIELDS = {'full_text': '(SELECT text FROM pages WHERE pages.url = articles.url)'}
+QUERY_KINDS = {'competitor_data': 'competitor', 'keyword_data': 'keyword'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    url TEXT,
+    published_at TEXT,
+    title TEXT,
+    description TEXT,
+    content TEXT,
+    cluster_size INTEGER,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_published_at ON articles (published_at);
+CREATE TABLE IF NOT EXISTS queries (
+    kind TEXT NOT NULL,
+    query TEXT NOT NULL,
+    status TEXT,
+    total_results INTEGER,
+    message TEXT,
+    PRIMARY KEY (kind, query)
+);
+CREATE TABLE IF NOT EXISTS query_articles (
+    kind TEXT NOT NULL,
+    query TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    article_id TEXT NOT NULL,
+    PRIMARY KEY (kind, query, position)
+);
+CREATE INDEX IF NOT EXISTS query_articles_article ON query_articles (article_id);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    article_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    title TEXT,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    query TEXT PRIMARY KEY,
+    published_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    article_id TEXT PRIMARY KEY,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    bucket BLOB NOT NULL,
+    article_id TEXT NOT NULL,
+    PRIMARY KEY (bucket, article_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS lsh_buckets_article ON lsh_buckets (article_id);
+"""
+
+
+# Row tuple for the articles table
+def _article_row(article_id, article):
+    extra = {k: v for k, v in article.items() if k not in ARTICLE_COLUMNS and k not in JOINED_FIELDS}
+    return (article_id, *(article.get(field) for field in ARTICLE_COLUMNS),
+            json.dumps(extra, separators=(',', ':')) if extra else None)
+
+
+# Rebuild article dicts from (id, *fields[, extra]) rows
+def _rows_to_articles(rows, fields, with_extra):
+    rows = rows.fetchall()
+    if with_extra:
+        # Decoding every extra column in one json.loads call keeps the parsing in C
+        extras = json.loads(f"[{','.join(row[-1] or '{}' for row in rows)}]")
+        rows = [row[:-1] for row in rows]
+    else:
+        extras = [{} for _ in rows]
+    articles = {}
+    for row, article in zip(rows, extras):
+        article.update(zip(fields, row[1:]))
+        if article.get('cluster_size', 0) is None:
+            del article['cluster_size']
+        articles[row[0]] = article
+    return articles
+
+
+class ArticleStore:
+    """SQLite store holding each collected article once.
+
+    Competitor and keyword queries reference articles by ID, in result order,
+    alongside the watermarks and near-duplicate aliases incremental runs need.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Articles by ID (all when ids is None); `fields` limits them to those columns
+    def get_articles(self, ids=None, fields=None):
+        with_extra = fields is None
+        fields = list(fields or ARTICLE_COLUMNS)
+        columns = ', '.join(['id'] + [ARTICLE_COLUMNS.get(field) or JOINED_FIELDS[field] for field in fields]
+                            + (['extra'] if with_extra else []))
+        select = f"SELECT {columns} FROM articles"
+        if ids is None:
+            return _rows_to_articles(self.conn.execute(select), fields, with_extra)
+        articles = {}
+        ids = list(dict.fromkeys(ids))
+        for start in range(0, len(ids), 500):  # Stay under SQLite's bound-parameter limit
+            chunk = ids[start:start + 500]
+            rows = self.conn.execute(f"{select} WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            articles.update(_rows_to_articles(rows, fields, with_extra))
+        return articles
+
+    def article_ids(self):
+        return [row[0] for row in self.conn.execute("SELECT id FROM articles")]
+
+    # Lazily yield (ID, article) pairs, reading `batch_size` rows at a time
+    def iter_articles(self, ids=None, fields=None, batch_size=500):
+        ids = list(dict.fromkeys(self.article_ids() if ids is None else ids))
+        for start in range(0, len(ids), batch_size):
+            yield from self.get_articles(ids[start:start + batch_size], fields=fields).items()
+
+    def query_article_ids(self, kind, query):
+        rows = self.conn.execute(
+            "SELECT article_id FROM query_articles WHERE kind = ? AND query = ? ORDER BY position",
+            (QUERY_KINDS.get(kind, kind), query))
+        return [row[0] for row in rows]
+
+    # Crawled pages stored for the given URLs: {url: {etag, last_modified, title, text}}.
+    # Articles read a page's text back as their full_text field.
+    def get_pages(self, urls):
+        pages = {}
+        urls = list(dict.fromkeys(urls))
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT url, etag, last_modified, title, text FROM pages WHERE url IN ({','.join('?' * len(chunk))})",
+                chunk)
+            for url, etag, last_modified, title, text in rows:
+                pages[url] = {'etag': etag, 'last_modified': last_modified, 'title': title, 'text': text}
+        return pages
+
+    # Signature of the crawled page behind each of the given articles that has one:
+    # {ID: 'etag|last_modified|length'}; a re-crawled page that changed gets a new one
+    def page_signatures(self, ids):
+        signatures = {}
+        ids = list(dict.fromkeys(ids))
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self.conn.execute(
+                "SELECT articles.id, pages.etag, pages.last_modified, length(pages.text) "
+                "FROM articles JOIN pages ON pages.url = articles.url "
+                f"WHERE articles.id IN ({','.join('?' * len(chunk))})", chunk)
+            signatures.update((i, f"{etag}|{last_modified}|{length}") for i, etag, last_modified, length in rows)
+        return signatures
+
+    def save_pages(self, pages):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                ((url, page.get('etag'), page.get('last_modified'), page.get('title'), page.get('text'))
+                 for url, page in pages.items()))
+
+    # MinHash signatures of stored articles sharing an LSH bucket with the given keys,
+    # in storage order: {ID: signature}
+    def fingerprint_candidates(self, buckets):
+        found = []
+        buckets = list(buckets)
+        for start in range(0, len(buckets), 500):
+            chunk = buckets[start:start + 500]
+            found += self.conn.execute(
+                "SELECT DISTINCT articles.rowid, fingerprints.article_id, fingerprints.signature "
+                "FROM lsh_buckets JOIN fingerprints ON fingerprints.article_id = lsh_buckets.article_id "
+                "JOIN articles ON articles.id = lsh_buckets.article_id "
+                f"WHERE lsh_buckets.bucket IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+        return {i: np.frombuffer(signature, dtype=np.uint64) for _, i, signature in sorted(found)}
+
+    # IDs of stored articles without a fingerprint, e.g. stored before fingerprints were kept
+    def unfingerprinted_ids(self):
+        rows = self.conn.execute(
+            "SELECT id FROM articles WHERE id NOT IN (SELECT article_id FROM fingerprints) ORDER BY rowid")
+        return [row[0] for row in rows]
+
+    # Everything collect_data needs from earlier runs, in the shape it used to read from JSON.
+    # Stored articles come back without their extra fields, which saving leaves untouched.
+    def load_collection(self):
+        collection = {source: {} for source in QUERY_KINDS}
+        kinds = {kind: source for source, kind in QUERY_KINDS.items()}
+        rows = self.conn.execute("SELECT kind, query, article_id FROM query_articles ORDER BY kind, query, position")
+        for kind, query, article_id in rows:
+            entry = collection[kinds[kind]].setdefault(query, {'article_ids': []})
+            entry['article_ids'].append(article_id)
+        collection['articles'] = self.get_articles(fields=ARTICLE_COLUMNS)
+        collection['aliases'] = dict(self.conn.execute("SELECT alias, article_id FROM aliases").fetchall())
+        collection['watermarks'] = dict(self.conn.execute("SELECT query, published_at FROM watermarks").fetchall())
+        return collection
+
+    # Write a collection run; replace=True discards what earlier runs stored.
+    # `fingerprints` ({ID: MinHash signature or None}) adds articles to the LSH index.
+    def save_collection(self, competitor_data, keyword_data, articles, aliases=None, watermarks=None,
+                        replace=True, fingerprints=None):
+        with self.conn:
+            if replace:
+                for table in ('articles', 'queries', 'query_articles', 'aliases', 'watermarks', 'fingerprints',
+                              'lsh_buckets'):
+                    self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany(
+                "INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET cluster_size = excluded.cluster_size",
+                (_article_row(i, article) for i, article in articles.items()))
+            for source, entries in (('competitor_data', competitor_data), ('keyword_data', keyword_data)):
+                kind = QUERY_KINDS[source]
+                for query, entry in entries.items():
+                    news_data = entry.get('newsapi') or {}
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO queries VALUES (?, ?, ?, ?, ?)",
+                        (kind, query, news_data.get('status'), news_data.get('totalResults'),
+                         news_data.get('message')))
+                    self.conn.execute("DELETE FROM query_articles WHERE kind = ? AND query = ?", (kind, query))
+                    self.conn.executemany(
+                        "INSERT INTO query_articles VALUES (?, ?, ?, ?)",
+                        ((kind, query, n, i) for n, i in enumerate(entry.get('article_ids', []))))
+            if aliases:
+                self.conn.executemany("INSERT OR REPLACE INTO aliases VALUES (?, ?)", aliases.items())
+                # Near-duplicates collapsed in this run are no longer stored on their own
+                for table, column in (('articles', 'id'), ('fingerprints', 'article_id'),
+                                      ('lsh_buckets', 'article_id')):
+                    self.conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", ((i,) for i in aliases))
+            if fingerprints:
+                # Articles without text keep an empty signature and no buckets, so they are not fingerprinted again
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO fingerprints VALUES (?, ?)",
+                    ((i, b'' if signature is None else signature.tobytes()) for i, signature in fingerprints.items()))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO lsh_buckets VALUES (?, ?)",
+                    ((key, i) for i, signature in fingerprints.items() if signature is not None
+                     for key in band_keys(signature)))
+            if watermarks:
+                self.conn.executemany("INSERT OR REPLACE INTO watermarks VALUES (?, ?)", watermarks.items())
+
+
+# Read a collected_data.json from an older version into the load_collection() shape
+def read_legacy_collection(path=LEGACY_COLLECTED_PATH):
+    with open(path) as f:
+        data = json.load(f)
+    if 'articles' in data:
+        return data
+    # The oldest files only carry the raw NewsAPI payload of each query
+    index = ArticleIndex()
+    for source in QUERY_KINDS:
+        for entry in data.get(source, {}).values():
+            entry['article_ids'] = index.add_many(entry.get('newsapi', {}).get('articles', []))
+    data['articles'] = index.articles
+    return data
+
+
+# Organized details holding only article IDs, dropping the embedded raw payloads
+def compact_organized_details(organized_details, collection):
+    compact = {}
+    for competitor, details in organized_details.items():
+        details = {k: v for k, v in details.items() if k != 'details'}
+        if 'article_ids' not in details:
+            entry = collection.get('competitor_data', {}).get(competitor, {})
+            details['article_ids'] = entry.get('article_ids', [])
+        compact[competitor] = details
+    return compact
+
+
+# Import the JSON blobs written by older versions into the store and compact organized details
+def migrate_legacy_files(store, collected_path=LEGACY_COLLECTED_PATH, organized_path=LEGACY_ORGANIZED_PATH):
+    collection = read_legacy_collection(collected_path)
+    store.save_collection(collection.get('competitor_data', {}), collection.get('keyword_data', {}),
+                          collection['articles'], collection.get('aliases'), collection.get('watermarks'))
+    if os.path.exists(organized_path):
+        with open(organized_path) as f:
+            organized_details = json.load(f)
+        with open(organized_path, 'w') as f:
+            json.dump(compact_organized_details(organized_details, collection), f, indent=4)
+    os.replace(collected_path, f"{collected_path}.migrated")
+    print(f"Migrated {collected_path} into {store.path}")
+
+
+# Open the article store, migrating old JSON output on first use
+def open_store(path=STORE_PATH):
+    exists = os.path.exists(path)
+    store = ArticleStore(path)
+    if not exists and os.path.exists(LEGACY_COLLECTED_PATH):
+        migrate_legacy_files(store)
+    return store
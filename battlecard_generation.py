@@ -1,6 +1,12 @@
 import json
 import os
 from groq import Groq
+from circuit_breaker import CircuitOpenError, get_breaker
+
+GROQ_TIMEOUT = 30.0  # Seconds per completion request
+
+# Once Groq keeps failing, the remaining battlecards are skipped instead of each waiting to time out
+groq_breaker = get_breaker('groq')
 
 # Load API keys and competitor profiles
 def load_api_keys(filename):
@@ -26,7 +32,7 @@ def load_competitor_profiles(filename):
         raise
 
 def generate_battlecard(competitor_name, competitor_profile, products, api_key):
-    client = Groq(api_key=api_key)
+    client = Groq(api_key=api_key, timeout=GROQ_TIMEOUT)
     prompt = f"""
     Generate a detailed battlecard for {competitor_name} using the following competitor profile and product information:
 
@@ -52,7 +58,7 @@ def generate_battlecard(competitor_name, competitor_profile, products, api_key):
     """
 
     try:
-        chat_completion = client.chat.completions.create(
+        chat_completion = groq_breaker.call(lambda: client.chat.completions.create(
             messages=[
                 {
                     "role": "user",
@@ -60,8 +66,11 @@ def generate_battlecard(competitor_name, competitor_profile, products, api_key):
                 }
             ],
             model="llama3-8b-8192",
-        )
+        ))
         return chat_completion.choices[0].message.content
+    except CircuitOpenError as e:
+        print(f"Skipping battlecard for {competitor_name}: {e}")
+        return None
     except Exception as e:
         print(f"Error generating battlecard for {competitor_name}: {e}")
         return None
@@ -0,0 +1,112 @@
+# Benchmark: NER throughput (docs/sec) of per-article nlp() calls vs batched nlp.pipe,
+# in-process and sharded across worker processes, then cold vs warm entity cache, then
+# a new extraction over the corpus: re-parsing vs reading docs back from DocBin shards
+#
+# --untrained swaps in a freshly initialized tok2vec + NER pipeline with the cost
+# profile of a real model, for machines without the trained model installed.
+#
+# Usage: python benchmarks/bench_analysis.py [--articles 2000] [--batch-sizes 16 64 256]
+#        [--processes 2 4] [--untrained]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_analysis
+import nlp_models
+from data_analysis import analyze_article_stream, analyze_text, article_text, reanalyze
+from doc_store import DocStore
+from entity_cache import EntityCache
+
+WORDS = ['Apple', 'Samsung', 'Google', 'launches', 'new', 'iPhone', 'Galaxy', 'Pixel', 'phone', 'market',
+         'shares', 'rose', 'after', 'the', 'company', 'reported', 'strong', 'sales', 'in', 'Europe', 'and',
+         'Asia', 'analysts', 'said', 'on', 'Monday', 'AI', 'chip', 'revenue', 'quarter']
+
+
+def make_article(n):
+    sentence = lambda k: ' '.join(random.choices(WORDS, k=k)).capitalize() + '.'
+    return {'title': sentence(10), 'description': sentence(30), 'content': ' '.join(sentence(20) for _ in range(4))}
+
+
+def untrained_pipeline():
+    import spacy
+    nlp = spacy.blank('en')
+    nlp.add_pipe('ner')
+    nlp.initialize()
+    return nlp
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=2000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--processes', type=int, nargs='*', default=[2, 4])
+    parser.add_argument('--untrained', action='store_true')
+    args = parser.parse_args()
+
+    random.seed(0)
+    # Parser throughput first; the cache and the doc store are measured last
+    data_analysis.entity_cache = None
+    data_analysis.doc_store = None
+    pairs = [(str(n), make_article(n)) for n in range(args.articles)]
+    if args.untrained:
+        nlp_models._models[nlp_models.MODEL_NAME] = untrained_pipeline()
+    nlp_models.get_nlp()('warm up')
+
+    print(f"{args.articles} articles, pipeline: {', '.join(nlp_models.get_nlp().pipe_names)}, "
+          f"{os.cpu_count()} cores")
+    print(f"{'path':>18} {'docs/sec':>9} {'speedup':>8}")
+    start = time.perf_counter()
+    for _, article in pairs:
+        analyze_text(article_text(article))
+    baseline = args.articles / (time.perf_counter() - start)
+    print(f"{'per-article':>18} {baseline:>9.0f} {1:>7.1f}x")
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        analyze_article_stream(iter(pairs), batch_size=batch_size)
+        rate = args.articles / (time.perf_counter() - start)
+        print(f"{f'pipe batch={batch_size}':>18} {rate:>9.0f} {rate / baseline:>7.1f}x")
+    expected = analyze_article_stream(iter(pairs))
+    for n_process in args.processes:
+        start = time.perf_counter()
+        # Worker start-up and model loading are part of the measured time
+        entities = analyze_article_stream(iter(pairs), n_process=n_process)
+        rate = args.articles / (time.perf_counter() - start)
+        assert list(entities.items()) == list(expected.items()), "process pool changed the results"
+        print(f"{f'processes={n_process}':>18} {rate:>9.0f} {rate / baseline:>7.1f}x")
+    with tempfile.TemporaryDirectory() as directory:
+        data_analysis.entity_cache = EntityCache(os.path.join(directory, 'entities.db'))
+        for label in ('cache cold', 'cache warm'):
+            start = time.perf_counter()
+            entities = analyze_article_stream(iter(pairs))
+            rate = args.articles / (time.perf_counter() - start)
+            assert entities == expected, "cached entities differ from parsed ones"
+            print(f"{label:>18} {rate:>9.0f} {rate / baseline:>7.1f}x")
+        print(f"Entity cache: {data_analysis.entity_cache.stats()}")
+
+        # A question the entity cache cannot answer, e.g. every entity with its label
+        extract = lambda doc: [(ent.text, ent.label_) for ent in doc.ents]
+        data_analysis.entity_cache = None
+        data_analysis.doc_store = DocStore(os.path.join(directory, 'docs'))
+        start = time.perf_counter()
+        analyze_article_stream(iter(pairs))
+        rate = args.articles / (time.perf_counter() - start)
+        print(f"{'parse + store docs':>18} {rate:>9.0f} {rate / baseline:>7.1f}x")
+        start = time.perf_counter()
+        texts = ((article_text(article), i) for i, article in pairs)
+        parsed = {i: extract(doc) for doc, i in nlp_models.get_nlp().pipe(texts, as_tuples=True)}
+        rate = args.articles / (time.perf_counter() - start)
+        print(f"{'re-parse, extract':>18} {rate:>9.0f} {rate / baseline:>7.1f}x")
+        start = time.perf_counter()
+        stored = reanalyze(extract)
+        rate = args.articles / (time.perf_counter() - start)
+        assert stored == parsed, "stored docs differ from parsed ones"
+        print(f"{'stored, extract':>18} {rate:>9.0f} {rate / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Benchmark: disk size and load time of the article store vs the old JSON blobs
+#
+# Usage: python benchmarks/bench_article_store.py [--articles 50000] [--queries 50]
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_index import ArticleIndex
+from article_store import ArticleStore
+
+WORDS = [f"word{i}" for i in range(2000)]
+
+
+def make_article(n):
+    return {
+        'source': {'id': None, 'name': random.choice(['Reuters', 'The Verge', 'Engadget', 'BBC News'])},
+        'author': f"Author {n % 500}",
+        'title': ' '.join(random.choices(WORDS, k=12)),
+        'description': ' '.join(random.choices(WORDS, k=30)),
+        'url': f"https://news.example.com/{n}",
+        'urlToImage': f"https://img.example.com/{n}.jpg",
+        'publishedAt': f"2024-{1 + n % 12:02d}-{1 + n % 28:02d}T{n % 24:02d}:00:00Z",
+        'content': ' '.join(random.choices(WORDS, k=40)) + '… [+2000 chars]'
+    }
+
+
+def file_size(path):
+    return os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    articles = [make_article(n) for n in range(args.articles)]
+    per_query = args.articles // args.queries
+    competitor_data = {
+        f"Competitor {q}": {'newsapi': {'status': 'ok', 'totalResults': per_query,
+                                        'articles': articles[q * per_query:(q + 1) * per_query]}}
+        for q in range(args.queries)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Old layout: raw payloads in collected_data.json, embedded again in organized_details.json
+        collected_path = os.path.join(tmp, 'collected_data.json')
+        organized_path = os.path.join(tmp, 'organized_details.json')
+        with open(collected_path, 'w') as f:
+            json.dump({'competitor_data': competitor_data, 'keyword_data': {}}, f, indent=4)
+        with open(organized_path, 'w') as f:
+            json.dump({name: {'details': data['newsapi'], 'products': [], 'market_trends': []}
+                       for name, data in competitor_data.items()}, f, indent=4)
+        start = time.perf_counter()
+        with open(collected_path) as f:
+            json.load(f)
+        with open(organized_path) as f:
+            json.load(f)
+        json_load = time.perf_counter() - start
+        json_size = file_size(collected_path) + file_size(organized_path)
+
+        # Article store: one row per article, queries reference IDs
+        index = ArticleIndex()
+        for entry in competitor_data.values():
+            entry['article_ids'] = index.add_many(entry['newsapi']['articles'])
+        store_path = os.path.join(tmp, 'articles.db')
+        start = time.perf_counter()
+        with ArticleStore(store_path) as store:
+            store.save_collection(competitor_data, {}, index.articles)
+        store_save = time.perf_counter() - start
+        loads = {}
+        for label, load in (('full articles', lambda store: store.get_articles()),
+                            ('collection', lambda store: store.load_collection()),
+                            ('analysis view', lambda store: store.get_articles(
+                                [i for e in competitor_data.values() for i in e['article_ids']],
+                                fields=('title', 'description', 'content')))):
+            start = time.perf_counter()
+            with ArticleStore(store_path) as store:
+                load(store)
+            loads[label] = time.perf_counter() - start
+        store_size = file_size(store_path)
+
+    print(f"{args.articles} articles across {args.queries} queries")
+    print(f"JSON blobs:    {json_size / 1e6:>7.1f} MB, load {json_load:.3f} s")
+    print(f"Article store: {store_size / 1e6:>7.1f} MB ({json_size / store_size:.1f}x smaller), save {store_save:.3f} s")
+    for label, seconds in loads.items():
+        print(f"  load {label:<14} {seconds:>7.3f} s ({json_load / seconds:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Benchmark: wall-clock time of the NewsAPI fan-out against the local replay server
+#
+# Usage: python benchmarks/bench_collection.py [--queries 55] [--latency 0.1]
+#
+# The worker sweep runs unthrottled; the last row repeats the widest fan-out through the
+# limiter collect_data uses by default (NEWSAPI_RATE / NEWSAPI_BURST).
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_collection
+from newsapi_replay import ReplayServer, write_fixture
+from rate_limiter import RateLimiter
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--queries', type=int, default=55)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as fixtures:
+        queries = [f"query-{i}" for i in range(args.queries)]
+        for query in queries:
+            write_fixture(fixtures, query, [{'title': query, 'url': f"https://example.com/{query}"}])
+        server = ReplayServer(fixtures, latency=args.latency).start()
+        data_collection.NEWSAPI_URL = server.url
+        data_collection.response_cache = None  # Measure the network path, not the cache
+
+        print(f"{args.queries} queries, {args.latency * 1000:.0f} ms server latency")
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}  limiter")
+        baseline = None
+        runs = [(workers, RateLimiter(rate=None), 'unthrottled') for workers in args.workers]
+        default = RateLimiter(rate=data_collection.NEWSAPI_RATE, capacity=data_collection.NEWSAPI_BURST)
+        runs.append((max(args.workers), default, f"default (rate={data_collection.NEWSAPI_RATE})"))
+        for workers, limiter, label in runs:
+            data_collection.rate_limiter = limiter
+            start = time.perf_counter()
+            results = data_collection.fetch_queries(queries, 'bench', max_workers=workers)
+            elapsed = time.perf_counter() - start
+            assert len(results) == len(queries)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.3f} {baseline / elapsed:>7.1f}x  {label}")
+
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Benchmark: cold-start cost of importing the pipeline modules
+#
+# Runs `python -X importtime` in a fresh interpreter and reports the cumulative
+# import time of each module, then the one-off cost of the first model load.
+#
+# Usage: python benchmarks/bench_import.py [module ...]
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ['data_collection', 'data_analysis']
+
+
+# Cumulative import time in microseconds for each top-level module
+def import_times(modules):
+    code = '; '.join(f"import {m}" for m in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        if cumulative.isdigit() and name in modules:
+            times[name] = int(cumulative)
+    return times
+
+
+# Wall-clock seconds for a fresh interpreter to run `code`
+def run_seconds(code):
+    wrapped = f"import time; _t = time.perf_counter(); {code}; print(time.perf_counter() - _t)"
+    result = subprocess.run([sys.executable, '-c', wrapped],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    modules = sys.argv[1:] or DEFAULT_MODULES
+    print("Cumulative import time (python -X importtime):")
+    for name, micros in import_times(modules).items():
+        print(f"  {name:<20} {micros / 1000:>9.1f} ms")
+
+    imports = '; '.join(f"import {m}" for m in modules)
+    import_only = run_seconds(imports)
+    with_model = run_seconds(f"{imports}; from nlp_models import get_nlp; get_nlp()")
+    print(f"Import only:             {import_only:>8.3f} s")
+    print(f"Import + first get_nlp:  {with_model:>8.3f} s (model load happens once, on first use)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Benchmark: memory held by a large corpus of received articles, whole vs projected
+#
+# Usage: python benchmarks/bench_projection.py [--articles 100000]
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_collection
+from article_projection import project_response
+
+WORDS = [f"word{i}" for i in range(2000)]
+SOURCES = ['Reuters', 'The Verge', 'Engadget', 'BBC News', 'TechCrunch', 'Wired', 'CNET', 'Ars Technica']
+
+
+def make_article(n):
+    source = random.choice(SOURCES)
+    return {
+        'source': {'id': source.lower().replace(' ', '-'), 'name': source},
+        'author': f"Author {n % 500}",
+        'title': ' '.join(random.choices(WORDS, k=12)),
+        'description': ' '.join(random.choices(WORDS, k=30)),
+        'url': f"https://news.example.com/{n}",
+        'urlToImage': f"https://img.example.com/{n}.jpg",
+        'publishedAt': f"2024-{1 + n % 12:02d}-{1 + n % 28:02d}T{n % 24:02d}:00:00Z",
+        'content': ' '.join(random.choices(WORDS, k=40)) + '… [+2000 chars]'
+    }
+
+
+# Bytes still allocated after receiving every page through `receive`
+def held_bytes(pages, receive):
+    gc.collect()
+    tracemalloc.start()
+    kept = [receive(json.loads(page)) for page in pages]
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=100000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    pages = [json.dumps({'status': 'ok', 'totalResults': args.articles,
+                         'articles': [make_article(n) for n in range(start, min(start + 100, args.articles))]})
+             for start in range(0, args.articles, 100)]
+    fields = data_collection.article_fields
+    variants = [
+        ('whole articles', lambda data: data),
+        ('projected', lambda data: project_response(data, fields)),
+        ('projected + source', lambda data: project_response(data, (*fields, 'source'))),
+    ]
+
+    print(f"{args.articles} articles; projection keeps {', '.join(fields)}")
+    print(f"{'variant':>20} {'MB held':>9} {'bytes/article':>14}")
+    baseline = None
+    for name, receive in variants:
+        size = held_bytes(pages, receive)
+        baseline = baseline or size
+        print(f"{name:>20} {size / 1e6:>9.1f} {size / args.articles:>14.0f}  ({size / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main()
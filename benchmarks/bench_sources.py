@@ -0,0 +1,70 @@
+# Benchmark: wall-clock time of each collection source alone vs all of them in parallel
+#
+# NewsAPI is served by the local replay server; the local source reads a generated corpus.
+#
+# Usage: python benchmarks/bench_sources.py [--documents 20000] [--latency 0.3]
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_collection
+from newsapi_replay import ReplayServer, write_fixture
+from rate_limiter import RateLimiter
+from sources import LocalDirectorySource, collect_from_sources
+
+COMPETITORS = ['Apple', 'Samsung', 'Google', 'Vivo', 'Xiaomi', 'Oppo', 'Huawei', 'Sony']
+KEYWORDS = ['Smartphones', 'Artificial Intelligence', 'Consumer Electronics']
+WORDS = [f"word{i}" for i in range(2000)]
+
+
+def write_corpus(directory, documents):
+    for n in range(documents):
+        names = random.sample(COMPETITORS + KEYWORDS, 2)
+        text = ' '.join(random.choices(WORDS, k=200) + names)
+        if n % 2:
+            with open(os.path.join(directory, f"doc{n}.md"), 'w') as f:
+                f.write(f"# {names[0]} update {n}\n{text}\n")
+        else:
+            with open(os.path.join(directory, f"doc{n}.json"), 'w') as f:
+                json.dump({'title': f"{names[0]} report {n}", 'description': text[:200], 'content': text}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--documents', type=int, default=20000)
+    parser.add_argument('--latency', type=float, default=0.3)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as fixtures, tempfile.TemporaryDirectory() as corpus:
+        for query in COMPETITORS + KEYWORDS:
+            write_fixture(fixtures, query, [{'title': f"{query} {i}", 'url': f"https://example.com/{query}/{i}"}
+                                            for i in range(100)])
+        write_corpus(corpus, args.documents)
+        server = ReplayServer(fixtures, latency=args.latency).start()
+        data_collection.NEWSAPI_URL = server.url
+        data_collection.response_cache = None
+        data_collection.rate_limiter = RateLimiter(rate=None)
+
+        newsapi = data_collection.NewsAPISource('bench', max_workers=4)
+        local = LocalDirectorySource(corpus, max_workers=8)
+        print(f"{len(COMPETITORS) + len(KEYWORDS)} queries, {args.documents} local documents, "
+              f"{args.latency * 1000:.0f} ms NewsAPI latency")
+        print(f"{'sources':>16} {'seconds':>9} {'articles':>9}")
+        for label, sources in (('newsapi', [newsapi]), ('local', [local]), ('newsapi + local', [newsapi, local])):
+            start = time.perf_counter()
+            _, report = collect_from_sources(sources, COMPETITORS, KEYWORDS)
+            elapsed = time.perf_counter() - start
+            articles = sum(timing['articles'] for timing in report.values())
+            print(f"{label:>16} {elapsed:>9.3f} {articles:>9}")
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Benchmark: requests/sec and CPU per request of the http_transport backends
+#
+# The replay server runs in a child process so its CPU time is not counted.
+# It speaks plain HTTP/1.1, so this measures the event loop and connection
+# reuse; HTTP/2 multiplexing only kicks in against HTTPS hosts.
+#
+# Usage: python benchmarks/bench_transport.py [--requests 2000] [--latency 0.02]
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from http_transport import TRANSPORTS, make_transport, pycurl
+from newsapi_replay import write_fixture
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Replay server did not start on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--connections', type=int, default=64)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    backends = [name for name in TRANSPORTS if name != 'curl' or pycurl is not None]
+    with tempfile.TemporaryDirectory() as fixtures:
+        write_fixture(fixtures, 'bench', [{'title': f"Article {i}", 'url': f"https://example.com/{i}"}
+                                          for i in range(20)])
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, 'newsapi_replay.py'), 'serve', '--dir', fixtures,
+             '--port', str(port), '--latency', str(args.latency)],
+            stdout=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            url = f"http://127.0.0.1:{port}/v2/everything"
+            batch = [{'url': url, 'params': {'q': 'bench', 'page': 1 + i % 5, 'pageSize': 4}}
+                     for i in range(args.requests)]
+
+            print(f"{args.requests} requests, {args.latency * 1000:.0f} ms server latency, "
+                  f"{args.connections} connections")
+            print(f"{'backend':>9} {'req/s':>9} {'cpu ms/req':>11} {'errors':>7}")
+            for name in backends:
+                transport = make_transport(name, max_connections=args.connections, per_host=args.connections)
+                best_rate, best_cpu, errors = 0.0, float('inf'), 0
+                for _ in range(args.rounds):
+                    wall, cpu = time.perf_counter(), time.process_time()
+                    responses = transport.fetch_many(batch)
+                    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+                    errors = sum(1 for r in responses if not r.ok)
+                    best_rate = max(best_rate, len(batch) / wall)
+                    best_cpu = min(best_cpu, cpu * 1000 / len(batch))
+                transport.close()
+                print(f"{name:>9} {best_rate:>9.0f} {best_cpu:>11.3f} {errors:>7}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import threading
+import time
+
+FAILURE_THRESHOLD = 3  # Consecutive failures that open a circuit
+RESET_TIMEOUT = 30.0  # Seconds an open circuit fails fast before letting a probe through
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Stops calling a service that keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    raise CircuitOpenError immediately. Once `reset_timeout` seconds have
+    passed one probe call is let through (half-open): success closes the
+    circuit, failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _admit(self):
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == CLOSED or (self.state == HALF_OPEN and not self._probing):
+                self._probing = self.state == HALF_OPEN
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError(f"{self.name} is unavailable after {self.consecutive_failures} consecutive "
+                               f"failures; retrying in {retry_in:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._probing = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error) if error is not None else None
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    # Call fn() through the circuit; `is_failure(result)` flags results that count as failures
+    def call(self, fn, is_failure=None):
+        self._admit()
+        try:
+            result = fn()
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        if is_failure is not None and is_failure(result):
+            self.record_failure(result)
+        else:
+            self.record_success()
+        return result
+
+    def stats(self):
+        with self._lock:
+            state = self.state
+            if state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                state = HALF_OPEN  # The next call will probe
+            return {
+                'state': state,
+                'consecutive_failures': self.consecutive_failures,
+                'rejected': self.rejected,
+                'retry_in_seconds': round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+                if state == OPEN else 0.0,
+                'last_error': self.last_error
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+# The process-wide breaker for a service, created on first use
+def get_breaker(name, **settings):
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **settings)
+        return _breakers[name]
+
+
+# Current state of every breaker, for display: {name: stats}
+def breaker_states():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
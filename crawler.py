@@ -0,0 +1,244 @@
+import codecs
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_transport import make_transport
+
+USER_AGENT = 'GENai-Battlecard/1.0 (+competitive research crawler)'
+CRAWL_TIMEOUT = (5, 20)  # (connect, read) seconds per request
+MAX_PAGE_BYTES = 2 * 1024 * 1024  # Stop reading a page after this many bytes
+PER_HOST_CONNECTIONS = 2
+DEFAULT_CRAWL_WORKERS = 16
+CHUNK_SIZE = 16 * 1024
+
+# Elements whose text never belongs to the article body
+SKIP_TAGS = {'script', 'style', 'noscript', 'svg', 'head', 'template', 'iframe', 'nav', 'footer'}
+# Elements that end a line of text
+BLOCK_TAGS = {'p', 'div', 'br', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr',
+              'section', 'article', 'header', 'blockquote', 'pre', 'table'}
+
+
+class HTMLTextExtractor(HTMLParser):
+    """Incremental HTML-to-text converter; feed() it chunks as they arrive."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self._parts = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        if tag == 'title':
+            self._in_title = True
+        elif tag in BLOCK_TAGS:
+            self._parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if tag == 'title':
+            self._in_title = False
+        elif tag in BLOCK_TAGS:
+            self._parts.append('\n')
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self._parts.append(data)
+
+    # Extracted text with whitespace collapsed inside lines and empty lines dropped
+    def text(self):
+        lines = (' '.join(line.split()) for line in ''.join(self._parts).splitlines())
+        return '\n'.join(line for line in lines if line)
+
+
+class Crawler:
+    """Fetches pages concurrently and extracts their text.
+
+    Each host gets at most `per_host` simultaneous connections, robots.txt is
+    fetched once per host and honoured, responses are read in chunks up to
+    `max_bytes` and parsed as they stream in, and pages seen before are
+    revalidated with ETag/Last-Modified so unchanged ones are not re-downloaded.
+
+    With transport='curl' pages are fetched in one batch through an
+    http_transport.CurlMultiTransport instead of one thread per request,
+    which scales better to thousands of URLs.
+    """
+
+    def __init__(self, max_workers=DEFAULT_CRAWL_WORKERS, per_host=PER_HOST_CONNECTIONS,
+                 max_bytes=MAX_PAGE_BYTES, timeout=CRAWL_TIMEOUT, user_agent=USER_AGENT, transport='requests'):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = user_agent
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=per_host)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.transport = None
+        if transport != 'requests':
+            self.transport = make_transport(transport, per_host=per_host, timeout=timeout, user_agent=user_agent)
+        self._host_slots = {}
+        self._robots = {}
+        self._lock = threading.Lock()
+        self.stats = {'fetched': 0, 'not_modified': 0, 'disallowed': 0, 'truncated': 0, 'errors': 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _host_slot(self, host):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    # Parsed robots.txt for the URL's origin, fetched once per host
+    def _robots_for(self, url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            entry = self._robots.get(origin)
+            owner = entry is None
+            if owner:
+                entry = self._robots[origin] = {'ready': threading.Event(), 'parser': None}
+        if owner:
+            parser = RobotFileParser()
+            try:
+                with self._host_slot(parts.netloc):
+                    response = self.session.get(f"{origin}/robots.txt", timeout=self.timeout)
+                if response.status_code in (401, 403):
+                    parser.disallow_all = True
+                elif response.ok:
+                    parser.parse(response.text.splitlines())
+                else:
+                    parser.allow_all = True
+            except requests.RequestException:
+                parser.allow_all = True
+            entry['parser'] = parser
+            entry['ready'].set()
+        entry['ready'].wait()
+        return entry['parser']
+
+    def _allowed(self, url):
+        if self._robots_for(url).can_fetch(self.user_agent, url):
+            return True
+        self._count('disallowed')
+        return False
+
+    # Conditional GET headers revalidating a page stored by an earlier crawl
+    @staticmethod
+    def _validators(cached):
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+
+    # Result for a response; `extract` returns (title, text, truncated) from its body
+    def _result(self, url, response, cached, extract):
+        result = {'url': url, 'status': 'error', 'title': '', 'text': None, 'etag': None, 'last_modified': None}
+        if response.status_code == 304 and cached:
+            self._count('not_modified')
+            return {**result, **cached, 'url': url, 'status': 'not_modified'}
+        if not response.ok or 'html' not in response.headers.get('Content-Type', 'text/html'):
+            self._count('errors')
+            return result
+        title, text, truncated = extract(response)
+        result.update(status='fetched', title=title, text=text, etag=response.headers.get('ETag'),
+                      last_modified=response.headers.get('Last-Modified'))
+        self._count('fetched')
+        if truncated:
+            self._count('truncated')
+        return result
+
+    # Fetch one URL; `cached` holds the etag/last_modified/text stored for it earlier
+    def fetch(self, url, cached=None):
+        if not self._allowed(url):
+            return {'url': url, 'status': 'disallowed', 'title': '', 'text': None, 'etag': None,
+                    'last_modified': None}
+        try:
+            with self._host_slot(urlsplit(url).netloc):
+                with self.session.get(url, headers=self._validators(cached), timeout=self.timeout,
+                                      stream=True) as response:
+                    return self._result(url, response, cached, self._extract)
+        except requests.RequestException:
+            self._count('errors')
+            return {'url': url, 'status': 'error', 'title': '', 'text': None, 'etag': None, 'last_modified': None}
+
+    # Stream the body through the text extractor, stopping at max_bytes
+    def _extract(self, response):
+        # requests assumes ISO-8859-1 for text/* without a charset; HTML today is mostly UTF-8
+        encoding = response.encoding if 'charset=' in response.headers.get('Content-Type', '') else 'utf-8'
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        extractor = HTMLTextExtractor()
+        received = 0
+        truncated = False
+        for chunk in response.iter_content(CHUNK_SIZE):
+            received += len(chunk)
+            if received > self.max_bytes:
+                chunk = chunk[:len(chunk) - (received - self.max_bytes)]
+                truncated = True
+            extractor.feed(decoder.decode(chunk))
+            if truncated:
+                break
+        extractor.feed(decoder.decode(b'', final=True))
+        extractor.close()
+        return ' '.join(extractor.title.split()), extractor.text(), truncated
+
+    # Text of a body the transport already read, capped at max_bytes
+    @staticmethod
+    def _extract_body(response):
+        extractor = HTMLTextExtractor()
+        extractor.feed(response.text)
+        extractor.close()
+        return ' '.join(extractor.title.split()), extractor.text(), response.truncated
+
+    # Fetch many URLs concurrently; returns {url: result}
+    def crawl(self, urls, cache=None):
+        urls = list(dict.fromkeys(u for u in urls if u and urlsplit(u).scheme in ('http', 'https')))
+        cache = cache or {}
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as pool:
+            if self.transport is None:
+                results = pool.map(lambda url: self.fetch(url, cache.get(url)), urls)
+                return dict(zip(urls, results))
+            allowed = list(pool.map(self._allowed, urls))
+        results = {url: {'url': url, 'status': 'disallowed', 'title': '', 'text': None, 'etag': None,
+                         'last_modified': None}
+                   for url in urls}
+        fetch_urls = [url for url, ok in zip(urls, allowed) if ok]
+        responses = self.transport.fetch_many(
+            ({'url': url, 'headers': self._validators(cache.get(url))} for url in fetch_urls),
+            max_bytes=self.max_bytes)
+        for url, response in zip(fetch_urls, responses):
+            if response.error is not None:
+                self._count('errors')
+                results[url] = {'url': url, 'status': 'error', 'title': '', 'text': None, 'etag': None,
+                                'last_modified': None}
+            else:
+                results[url] = self._result(url, response, cache.get(url), self._extract_body)
+        return results
+
+    def close(self):
+        self.session.close()
+        if self.transport is not None:
+            self.transport.close()
@@ -1,23 +1,31 @@
-import json
-import spacy
-from collections import defaultdict
+import os
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from article_index import article_id
+from article_store import open_store
+from doc_store import DocStore
+from entity_cache import EntityCache, make_entity_key, model_fingerprint
+from nlp_models import MODEL_NAME, get_nlp
+from profile_state import ProfileState
+from utils import iter_json_items, save_json
 
-# Initialize SpaCy NLP model
-nlp = spacy.load('en_core_web_sm')
+# Article fields the analysis reads
+ANALYSIS_FIELDS = ('title', 'description', 'content', 'full_text')
+MAX_ANALYSIS_CHARS = 100000  # Crawled pages can be long; spaCy refuses texts over nlp.max_length
+NLP_BATCH_SIZE = 64  # Texts per nlp.pipe batch; larger batches trade memory for throughput
+# Worker processes for NER; 1 runs in-process, 0 uses every core
+ANALYSIS_PROCESSES = int(os.environ.get('ANALYSIS_PROCESSES', '1'))
+SHARD_BATCHES = 4  # nlp.pipe batches per shard sent to a worker
+CACHE_LOOKUP_CHUNK = 500  # Texts looked up in the entity cache per query
 
-# Load JSON data
-def load_json(filename):
-    with open(filename) as f:
-        return json.load(f)
+# Entities extracted by earlier runs, keyed by text hash and model; set to None to always parse
+entity_cache = EntityCache()
+# Parsed docs kept in DocBin shards for re-analysis without the model; set to None to keep none
+doc_store = DocStore()
 
-# Save JSON data
-def save_json(data, filename):
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=4)
-
-# Extract and analyze text using SpaCy
-def analyze_text(text):
-    doc = nlp(text)
+# Entity texts of a parsed doc, grouped by label
+def doc_entities(doc):
     entities = defaultdict(list)
     
     for ent in doc.ents:
@@ -25,43 +33,243 @@ def analyze_text(text):
     
     return entities
 
-# Process and structure competitor profiles
-def process_competitor_profiles(collected_data, organized_details):
+# Extract and analyze text using SpaCy, reusing the entities of a text parsed before
+def analyze_text(text):
+    nlp = get_nlp()
+    if entity_cache is None:
+        return doc_entities(nlp(text))
+    key = make_entity_key(text, model_fingerprint(nlp))
+    cached = entity_cache.get(key)
+    if cached is not None:
+        return defaultdict(list, cached)
+    entities = doc_entities(nlp(text))
+    entity_cache.set(key, entities)
+    return entities
+
+# Combine the text fields of an article that the analysis reads
+def article_text(article):
+    title = article.get('title') or ''
+    description = article.get('description') or ''
+    # Crawled full text supersedes NewsAPI's truncated content
+    content = article.get('full_text') or article.get('content') or ''
+    return f"{title} {description} {content}"[:MAX_ANALYSIS_CHARS]
+
+# Analyze a stream of (article ID, article) pairs, keeping only each article's entities.
+# Texts go through nlp.pipe in batches, each tagged with its article ID to route the result back.
+# With n_process other than 1, shards are parsed by worker processes and merged back in input order.
+def analyze_article_stream(pairs, wanted=None, batch_size=NLP_BATCH_SIZE, n_process=1):
+    def texts():
+        seen = set()
+        for i, article in pairs:
+            if i in seen or (wanted is not None and i not in wanted):
+                continue
+            seen.add(i)
+            yield article_text(article), i
+    
+    if entity_cache is None and doc_store is None:
+        return dict(_parse(texts(), batch_size, n_process))
+    return _analyze_with_cache(texts(), batch_size, n_process)
+
+# Parse (text, article ID) pairs; yields (ID, entities), adding each doc to `writer` if given
+def _parse(texts, batch_size, n_process, writer=None, keys=None):
+    if n_process != 1:
+        return _analyze_in_processes(texts, batch_size, n_process, writer, keys)
+    docs = get_nlp().pipe(texts, as_tuples=True, batch_size=batch_size)
+    if writer is None:
+        return ((i, dict(doc_entities(doc))) for doc, i in docs)
+    return _keep_docs(docs, writer, keys)
+
+def _keep_docs(docs, writer, keys):
+    for doc, i in docs:
+        writer.add(i, keys[i], doc)
+        yield i, dict(doc_entities(doc))
+
+# Serve texts parsed before from the entity cache or the doc store and parse only the rest;
+# returns {ID: entities}. With a doc store, a text counts as parsed only once its doc is stored.
+def _analyze_with_cache(texts, batch_size, n_process):
+    model = model_fingerprint(get_nlp())
+    order = []
+    cached = {}
+    stored = {}
+    keys = {}
+    
+    def misses():
+        for chunk in iter(lambda: list(islice(texts, CACHE_LOOKUP_CHUNK)), []):
+            chunk_keys = {i: make_entity_key(text, model) for text, i in chunk}
+            found = entity_cache.get_many(chunk_keys.values()) if entity_cache is not None else {}
+            for text, i in chunk:
+                order.append(i)
+                key = chunk_keys[i]
+                in_store = doc_store is not None and doc_store.has(i, key, model)
+                if key in found and (doc_store is None or in_store):
+                    cached[i] = found[key]
+                elif in_store:
+                    stored[i] = key
+                else:
+                    keys[i] = key
+                    yield text, i
+    
+    writer = doc_store.writer(model) if doc_store is not None else None
+    parsed = dict(_parse(misses(), batch_size, n_process, writer, keys))
+    if writer is not None:
+        writer.close()
+    # Entities missing from the cache but parsed before are read back from the stored docs
+    if stored:
+        parsed.update(reanalyze(lambda doc: dict(doc_entities(doc)), stored))
+        keys.update(stored)
+    if entity_cache is not None:
+        entity_cache.set_many({keys[i]: entities for i, entities in parsed.items()})
+    return {i: parsed[i] if i in parsed else cached[i] for i in order}
+
+# Run `extract` over the parsed docs in the doc store instead of re-parsing the articles:
+# returns {article ID: extract(doc)} for the given IDs, or for every article in the article store
+def reanalyze(extract, article_ids=None):
+    if article_ids is None:
+        with open_store() as store:
+            article_ids = store.article_ids()
+    vocab = get_nlp().vocab
+    return {i: extract(doc) for i, doc in doc_store.iter_docs(article_ids, vocab=vocab)}
+
+# Worker process setup: load the model once, before the first shard arrives
+def _init_worker(model_name):
+    get_nlp(model_name)
+
+# Entities for one shard of (text, article ID) pairs, parsed in a worker; with keep_docs
+# the parsed docs come back too, as serialized DocBin bytes
+def _analyze_shard(shard, batch_size, model_name, keep_docs=False):
+    docs = get_nlp(model_name).pipe(shard, as_tuples=True, batch_size=batch_size)
+    if not keep_docs:
+        return [(i, dict(doc_entities(doc))) for doc, i in docs], None
+    from spacy.tokens import DocBin
+    doc_bin = DocBin()
+    results = []
+    for doc, i in docs:
+        doc_bin.add(doc)
+        results.append((i, dict(doc_entities(doc))))
+    return results, doc_bin.to_bytes()
+
+# Shard (text, article ID) pairs across worker processes; yields (ID, entities) in input order
+def _analyze_in_processes(texts, batch_size, n_process, writer=None, keys=None):
+    n_process = n_process or os.cpu_count() or 1
+    shard_size = batch_size * SHARD_BATCHES
+    shards = iter(lambda: list(islice(texts, shard_size)), [])
+    keep_docs = writer is not None
+    with ProcessPoolExecutor(max_workers=n_process, initializer=_init_worker, initargs=(MODEL_NAME,)) as pool:
+        # A couple of shards queued per worker keeps them busy without reading the whole corpus ahead
+        pending = deque(pool.submit(_analyze_shard, shard, batch_size, MODEL_NAME, keep_docs)
+                        for shard in islice(shards, 2 * n_process))
+        while pending:
+            results, docs = pending.popleft().result()
+            for shard in islice(shards, 1):
+                pending.append(pool.submit(_analyze_shard, shard, batch_size, MODEL_NAME, keep_docs))
+            if keep_docs:
+                writer.add_serialized([(i, keys[i]) for i, _ in results], docs)
+            yield from results
+
+# Process and structure competitor profiles; collected_data['articles'] may be a
+# dict or a lazy stream of (article ID, article) pairs such as ArticleStore.iter_articles()
+def process_competitor_profiles(collected_data, organized_details, batch_size=NLP_BATCH_SIZE, n_process=1):
     profiles = {}
+    articles = collected_data.get('articles', {})
+    pairs = articles.items() if isinstance(articles, dict) else articles
     
+    # Files written before article IDs existed only carry the raw payload
+    competitor_ids = {}
+    legacy = []
     for competitor, data in organized_details.items():
-        articles = data.get('details', {}).get('articles', [])
+        ids = data.get('article_ids')
+        if ids is None:
+            legacy_pairs = [(article_id(article), article)
+                            for article in data.get('details', {}).get('articles', [])]
+            legacy.extend(legacy_pairs)
+            ids = [i for i, _ in legacy_pairs]
+        competitor_ids[competitor] = ids
+    wanted = {i for ids in competitor_ids.values() for i in ids}
+    
+    # Every competitor's articles go through one corpus-wide nlp.pipe run; each unique
+    # article is analyzed once as it streams past, however many competitors share it
+    entities_by_id = analyze_article_stream(chain(legacy, pairs), wanted, batch_size, n_process)
+    
+    for competitor, ids in competitor_ids.items():
         products = []
         trends = []
         
-        # Analyze each article
-        for article in articles:
-            title = article.get('title', '')
-            description = article.get('description', '')
-            content = article.get('content', '')
-            
-            # Extract products and trends from title and content
-            entities = analyze_text(f"{title} {description} {content}")
-            
+        # Extract products and trends from each article's title and content
+        for i in ids:
+            entities = entities_by_id.get(i, {})
             if 'PRODUCT' in entities:
                 products.extend(entities['PRODUCT'])
             if 'ORG' in entities:
                 trends.extend(entities['ORG'])
         
+        # Sorted, so a full rebuild and an incremental update write the same file
         profiles[competitor] = {
-            'products': list(set(products)),  # Remove duplicates
-            'market_trends': list(set(trends))  # Remove duplicates
+            'products': sorted(set(products)),  # Remove duplicates
+            'market_trends': sorted(set(trends))  # Remove duplicates
         }
     
     return profiles
 
-# Main function to perform data analysis
-def analyze_data():
-    collected_data = load_json('output/collected_data.json')
-    organized_details = load_json('output/organized_details.json')
+# Bring the profile state up to date with each competitor's current articles and return the
+# profiles. Only articles the state has not analyzed, or whose text changed, go through NER;
+# everything else is a membership change applied to the stored entity counts.
+def update_competitor_profiles(store, organized_details, state, batch_size=NLP_BATCH_SIZE, n_process=1):
+    model = model_fingerprint(get_nlp())
+    if state.model != model:
+        state.reset(model)  # Entities found by another model are not mixed in
+    competitor_ids = {competitor: details.get('article_ids', []) for competitor, details in organized_details.items()}
+    ids = list(dict.fromkeys(chain.from_iterable(competitor_ids.values())))
+    
+    # Stored article rows keep their text; it changes only through a re-crawled page, or when a
+    # non-incremental collection rebuilt the store and flagged every article as new
+    pages = store.page_signatures(ids)
+    flagged = {i for details in organized_details.values() for i in details.get('new_article_ids', [])}
+    candidates = [i for i in ids
+                  if i in flagged or state.version(i) is None or state.version(i)[1] != pages.get(i)]
+    versions = {}
+    
+    def changed():
+        for i, article in store.iter_articles(candidates, fields=ANALYSIS_FIELDS):
+            version = [make_entity_key(article_text(article), model), pages.get(i)]
+            if version != state.version(i):
+                versions[i] = version
+                yield i, article
     
-    # Process competitor profiles
-    competitor_profiles = process_competitor_profiles(collected_data, organized_details)
+    for i, entities in analyze_article_stream(changed(), batch_size=batch_size, n_process=n_process).items():
+        state.set_article(i, versions[i], entities)
+    for competitor in set(state.members) - set(competitor_ids):
+        state.drop_competitor(competitor)
+    for competitor, article_ids in competitor_ids.items():
+        state.set_members(competitor, article_ids)
+    state.prune()
+    print(f"Profiles updated: {len(versions)} of {len(ids)} articles analyzed")
+    return state.profiles(competitor_ids)
+
+# Main function to perform data analysis; incremental=True analyzes only the articles
+# added or changed since the last incremental run and merges them into its entity counts
+def analyze_data(n_process=ANALYSIS_PROCESSES, incremental=False):
+    # Opening the store first migrates output written by older versions
+    with open_store() as store:
+        organized_details = dict(iter_json_items('output/organized_details.json'))
+        if incremental:
+            state = ProfileState.load()
+            competitor_profiles = update_competitor_profiles(store, organized_details, state, n_process=n_process)
+            state.save()
+        else:
+            article_ids = [i for details in organized_details.values() for i in details.get('article_ids', [])]
+            
+            # Articles stream out of the store in batches instead of being loaded at once
+            collected_data = {'articles': store.iter_articles(article_ids, fields=ANALYSIS_FIELDS)}
+            
+            # Process competitor profiles
+            competitor_profiles = process_competitor_profiles(collected_data, organized_details, n_process=n_process)
+        if doc_store is not None:
+            # Docs of articles the store no longer holds are dropped and their shards rewritten
+            dropped = doc_store.retain(store.article_ids())
+    if entity_cache is not None:
+        print(f"Entity cache: {entity_cache.stats()}")
+    if doc_store is not None:
+        print(f"Parsed docs stored: {len(doc_store)} ({dropped} dropped)")
     
     # Save competitor profiles to a JSON file
     save_json(competitor_profiles, 'competitor_profiles.json')
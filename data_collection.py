@@ -1,11 +1,93 @@
 import requests
 import json
 import os
-import spacy
-os.system('python -m spacy download en_core_web_sm')
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from article_index import HASH_FIELDS, ArticleIndex
+from article_projection import project_response
+from article_store import open_store
+from circuit_breaker import CircuitOpenError, get_breaker
+from crawler import Crawler
+from data_analysis import ANALYSIS_FIELDS
+from hedging import DeadlineExceeded, Hedger
+from near_duplicates import FINGERPRINT_FIELDS, band_keys, cluster_near_duplicates, fingerprint
+from nlp_models import get_nlp
+from query_coalescing import MATCH_FIELDS, coalesce_queries, demultiplex
+from rate_limiter import RETRY_STATUSES, RateLimiter
+from response_cache import ResponseCache, make_cache_key
+from singleflight import SingleFlight
+from sources import Source, collect_from_sources, merge_source_results
+from utils import save_json
 
-# Initialize SpaCy NLP model
-nlp = spacy.load('en_core_web_sm')
+# NewsAPI endpoint and HTTP settings shared by every fetch; NEWSAPI_BASE_URL can point
+# the pipeline at a stand-in such as newsapi_replay.ReplayServer
+NEWSAPI_BASE_URL = os.environ.get('NEWSAPI_BASE_URL', 'https://newsapi.org')
+NEWSAPI_URL = f"{NEWSAPI_BASE_URL.rstrip('/')}/v2/everything"
+REQUEST_TIMEOUT = (5, 30)  # (connect, read) seconds per request
+DEFAULT_MAX_WORKERS = 8
+MAX_PAGE_SIZE = 100  # Largest pageSize /v2/everything accepts
+# Articles collected per query, paged through iter_articles; every MAX_PAGE_SIZE more costs a request
+QUERY_ARTICLE_BUDGET = int(os.environ.get('NEWSAPI_MAX_ARTICLES', MAX_PAGE_SIZE))
+# Pages a coalesced OR batch reads, however many names it holds, so it stays a request or two
+# instead of one per name; names it leaves without articles are re-queried on their own
+COALESCED_BATCH_PAGES = 2
+# Requests per second sent to NewsAPI, unthrottled when unset: plans are metered per day or month,
+# not per second, so the 429/Retry-After backoff paces the fan-out. Set NEWSAPI_RATE to spread a
+# quota out, e.g. 0.01 for roughly 860 requests a day.
+NEWSAPI_RATE = float(os.environ['NEWSAPI_RATE']) if os.environ.get('NEWSAPI_RATE') else None
+NEWSAPI_BURST = int(os.environ.get('NEWSAPI_BURST', '5'))  # Requests that may go out back to back
+QUERY_BUDGET = 15.0  # Seconds one NewsAPI request may take, retries and hedges included
+# Seconds collect_data waits for all queries before going on without the rest; by default
+# stretched to what NEWSAPI_RATE needs for the run (see default_deadline)
+COLLECTION_DEADLINE = 45.0
+# Error codes for queries left out of a run: too slow, unreachable, their source's circuit was open
+# or the whole source failed
+UNAVAILABLE_CODES = ('deadlineExceeded', 'requestFailed', 'circuitOpen', 'sourceFailed')
+CRAWL_TRANSPORT = os.environ.get('CRAWL_TRANSPORT', 'requests')  # 'curl' for large crawls, see http_transport
+NER_BATCH_SIZE = 256  # Titles per nlp.pipe batch
+NER_LABELS = ('ORG', 'PRODUCT')  # Entity labels the products and trends views use
+# Article fields collection itself reads: crawl targets, watermarks and NER titles
+COLLECTION_FIELDS = ('url', 'publishedAt', 'title')
+
+_session = None
+_session_lock = threading.Lock()
+
+# On-disk cache of NewsAPI responses; set to None to always hit the network
+response_cache = ResponseCache()
+
+# Every NewsAPI request goes through this limiter, shared by all workers
+rate_limiter = RateLimiter(rate=NEWSAPI_RATE, capacity=NEWSAPI_BURST)
+
+# Optional newsapi_replay.FixtureRecorder capturing every successful response
+response_recorder = None
+
+# Fields kept from each NewsAPI article as responses arrive: whatever a downstream stage
+# declares it reads. Everything else (urlToImage, source, author, ...) is dropped before
+# caching and storage; add fields here to keep them, or set to None to keep whole articles.
+article_fields = tuple(dict.fromkeys(
+    (*COLLECTION_FIELDS, *HASH_FIELDS, *FINGERPRINT_FIELDS, *MATCH_FIELDS, *ANALYSIS_FIELDS)))
+
+# NewsAPI requests slower than the recent p95 get a hedged duplicate
+hedger = Hedger()
+
+# Once NewsAPI keeps failing, further requests fail fast until a probe succeeds
+newsapi_breaker = get_breaker('newsapi')
+
+# Identical NewsAPI requests in flight at the same time (e.g. from concurrent app sessions) share one call
+inflight_requests = SingleFlight()
+
+# Return the shared keep-alive session, creating it on first use
+def get_session(pool_size=DEFAULT_MAX_WORKERS):
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
 
 # Load API keys from a file
 def load_api_keys():
@@ -13,95 +95,492 @@ def load_api_keys():
         return json.load(f)
 
 # Perform a search using NewsAPI
-def newsapi_search(query, api_key):
-    url = f"https://newsapi.org/v2/everything?q={query}&apiKey={api_key}"
-    response = requests.get(url)
-    return response.json()
+def newsapi_search(query, api_key, session=None, timeout=REQUEST_TIMEOUT, use_cache=True, params=None):
+    params = {**(params or {}), 'q': query, 'apiKey': api_key}
+    cache = response_cache if use_cache else None
+    # Responses are cached after projection, so the projection is part of the key
+    key = make_cache_key(query, {**params, 'fields': article_fields})
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            if response_recorder is not None:
+                response_recorder.record(params, cached)
+            return cached
+    # Callers waiting on the same request get the leader's response, so treat it as read-only
+    return inflight_requests.do(key, lambda: _newsapi_fetch(key, params, session, timeout, cache))
+
+# Send one NewsAPI request through the rate limiter and cache a successful response
+def _newsapi_fetch(key, params, session, timeout, cache):
+    session = session or get_session()
+    get = lambda: session.get(NEWSAPI_URL, params=params, timeout=timeout)
+    # The hedger waits for each attempt's turn on the limiter before timing it
+    send = lambda: rate_limiter.call(get, acquired=True)
+    try:
+        # Throttling and server errors that outlast the retries count against the circuit
+        response = newsapi_breaker.call(
+            lambda: hedger.call(send, budget=QUERY_BUDGET, acquire=rate_limiter.wait_for_turn),
+            is_failure=lambda response: response.status_code in RETRY_STATUSES)
+    except DeadlineExceeded as e:
+        return {'status': 'error', 'code': 'deadlineExceeded', 'message': str(e)}
+    except CircuitOpenError as e:
+        return {'status': 'error', 'code': 'circuitOpen', 'message': str(e)}
+    except requests.RequestException as e:
+        # Connection errors and timeouts that outlast the retries fail this query, not the whole source
+        return {'status': 'error', 'code': 'requestFailed', 'message': str(e)}
+    try:
+        data = response.json()
+    except ValueError:
+        data = {'status': 'error', 'code': str(response.status_code), 'message': response.reason}
+    if not response.ok and data.get('status') == 'ok':
+        data = {'status': 'error', 'code': str(response.status_code), 'message': response.reason}
+    data = project_response(data, article_fields)
+    # Only successful responses are cached so errors are retried next run
+    if cache is not None and data.get('status') == 'ok':
+        cache.set(key, data)
+    if response_recorder is not None:
+        response_recorder.record(params, data)
+    return data
+
+# Lazily walk every page of a NewsAPI query, yielding one article at a time.
+# Error responses (other than the end of the result window) are appended to `errors` if given.
+def iter_articles(query, api_key, max_articles=None, page_size=MAX_PAGE_SIZE, session=None, params=None,
+                  use_cache=True, errors=None):
+    # Page size stays fixed across pages so page offsets line up
+    page_size = min(page_size, MAX_PAGE_SIZE, max_articles or MAX_PAGE_SIZE)
+    yielded = 0
+    page = 1
+    while max_articles is None or yielded < max_articles:
+        page_params = {**(params or {}), 'page': page, 'pageSize': page_size}
+        data = newsapi_search(query, api_key, session=session, use_cache=use_cache, params=page_params)
+        if data.get('status') != 'ok':
+            # NewsAPI reports the end of the accessible window as an error
+            if page == 1 or data.get('code') != 'maximumResultsReached':
+                print(f"NewsAPI error for '{query}' (page {page}): {data.get('message', data.get('code'))}")
+                if errors is not None:
+                    errors.append(data)
+            return
+        articles = data.get('articles', [])
+        for article in articles:
+            yield article
+            yielded += 1
+            if max_articles is not None and yielded >= max_articles:
+                return
+        if len(articles) < page_size or yielded >= data.get('totalResults', 0):
+            return
+        page += 1
+
+# One response holding up to `max_articles` of a query, paged through iter_articles;
+# a query whose first page failed gets that page's error
+def search_pages(query, api_key, max_articles, session=None, params=None, use_cache=True):
+    errors = []
+    articles = list(iter_articles(query, api_key, max_articles=max_articles, session=session, params=params,
+                                  use_cache=use_cache, errors=errors))
+    if errors and not articles:
+        return errors[0]
+    return {'status': 'ok', 'totalResults': len(articles), 'articles': articles}
+
+# Collection deadline for a run of `n_requests` NewsAPI requests: COLLECTION_DEADLINE, or longer
+# when the rate limiter needs more time to send them all, plus one request's budget
+def default_deadline(n_requests):
+    rate = rate_limiter.bucket.rate
+    if rate is None:
+        return COLLECTION_DEADLINE
+    queued = max(0, n_requests - rate_limiter.bucket.capacity) / rate
+    return max(COLLECTION_DEADLINE, queued + QUERY_BUDGET)
+
+# Page through up to `article_budget` articles of every query on a bounded thread pool;
+# `query_budgets` ({query: max articles}) overrides the budget of single queries. Queries still
+# running after `deadline` seconds get a deadlineExceeded error result; they finish in the
+# background, so their responses still reach the cache for the next run.
+def fetch_queries(queries, api_key, max_workers=DEFAULT_MAX_WORKERS, query_params=None, deadline=None,
+                  use_cache=True, query_budgets=None, article_budget=QUERY_ARTICLE_BUDGET):
+    queries = list(dict.fromkeys(queries))  # Drop repeated queries, keep order
+    if not queries:
+        return {}
+    query_params = query_params or {}
+    query_budgets = query_budgets or {}
+    session = get_session(pool_size=max_workers)
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries))))
+    futures = {query: pool.submit(search_pages, query, api_key, query_budgets.get(query, article_budget),
+                                  session=session, params=query_params.get(query), use_cache=use_cache)
+               for query in queries}
+    done, _ = wait(futures.values(), timeout=deadline)
+    pool.shutdown(wait=False, cancel_futures=True)
+    return {
+        query: future.result() if future in done else
+        {'status': 'error', 'code': 'deadlineExceeded',
+         'message': f"No response within the {deadline}s collection deadline"}
+        for query, future in futures.items()
+    }
 
 # Save collected data to a JSON file
 def save_data_to_json(data, filename='collected_data.json'):
     os.makedirs('output', exist_ok=True)  # Create 'output' directory if it doesn't exist
     filepath = os.path.join('output', filename)
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=4)
+    save_json(data, filepath)
     print(f"Data saved to {filepath}")
 
+# Load a previously saved output file, or None if there is none
+def load_data_from_json(filename):
+    filepath = os.path.join('output', filename)
+    if not os.path.exists(filepath):
+        return None
+    with open(filepath) as f:
+        return json.load(f)
+
+# Newest publishedAt seen per query, used as the from= of the next incremental fetch
+def update_watermarks(watermarks, results):
+    for query, news_data in results.items():
+        if news_data.get('status') != 'ok':
+            continue
+        newest = max((a.get('publishedAt') or '' for a in _articles(news_data)), default='')
+        if newest > watermarks.get(query, ''):
+            watermarks[query] = newest
+    return watermarks
+
+# Articles from a NewsAPI response dict, or from any iterable such as iter_articles()
+def _articles(news_data):
+    if isinstance(news_data, dict):
+        return news_data.get('articles', [])
+    return news_data
+
+# Title of an article as parsed by the NER stage
+def _title(article):
+    return article.get('title') or ''
+
+# Parse each unique title exactly once, in batches, keeping PRODUCT/ORG entities
+def extract_title_entities(articles, batch_size=NER_BATCH_SIZE):
+    titles = list(dict.fromkeys(_title(article) for article in articles))
+    docs = get_nlp().pipe(titles, batch_size=batch_size)
+    return {
+        title: [(ent.text, ent.label_) for ent in doc.ents if ent.label_ in NER_LABELS]
+        for title, doc in zip(titles, docs)
+    }
+
+# Entities for each article's title, from a precomputed map or parsed on the fly
+def _iter_title_entities(news_data, title_entities=None):
+    articles = _articles(news_data)
+    if title_entities is not None:
+        return (title_entities[_title(article)] for article in articles)
+    docs = get_nlp().pipe((_title(article) for article in articles), batch_size=NER_BATCH_SIZE)
+    return ([(ent.text, ent.label_) for ent in doc.ents] for doc in docs)
+
 # Extract products from NewsAPI data
-def extract_products(news_data):
+def extract_products(news_data, title_entities=None):
     products = []
-    for article in news_data.get('articles', []):
-        doc = nlp(article.get('title', ''))
-        for ent in doc.ents:
-            if ent.label_ in ['PRODUCT']:
-                products.append(ent.text)
+    for entities in _iter_title_entities(news_data, title_entities):
+        products.extend(text for text, label in entities if label == 'PRODUCT')
     return products
 
 # Extract market trends from NewsAPI data
-def extract_market_trends(news_data):
+def extract_market_trends(news_data, title_entities=None):
     trends = []
-    for article in news_data.get('articles', []):
-        doc = nlp(article.get('title', ''))
-        for ent in doc.ents:
-            if ent.label_ in ['ORG', 'PRODUCT']:
-                trends.append(ent.text)
+    for entities in _iter_title_entities(news_data, title_entities):
+        trends.extend(text for text, label in entities if label in NER_LABELS)
     return trends
 
 # Extract and organize competitor details, products, and market trends
-def extract_competitor_details(competitor_data, keyword_data):
+def extract_competitor_details(competitor_data, keyword_data, articles=None):
     organized_data = {}
     
+    # With the shared article map, each query's views skip duplicates and rewrites
+    def query_articles(data):
+        if articles is not None and 'article_ids' in data:
+            return [articles[i] for i in data['article_ids']]
+        return list(_articles(data.get('newsapi', {})))
+    
+    competitor_articles = {name: query_articles(data) for name, data in competitor_data.items()}
+    keyword_articles = {keyword: query_articles(data) for keyword, data in keyword_data.items()}
+    
+    # One NER pass over every unique title feeds both the products and trends views
+    title_entities = extract_title_entities(
+        article
+        for source in (competitor_articles, keyword_articles)
+        for query_result in source.values()
+        for article in query_result
+    )
+    
+    # Keyword trends do not depend on the competitor, so build them once
+    keyword_trends = []
+    for keyword, keyword_result in keyword_articles.items():
+        trends = extract_market_trends(keyword_result, title_entities)
+        if trends:
+            keyword_trends.append({
+                'keyword': keyword,
+                'trends': trends
+            })
+    
     for competitor, data in competitor_data.items():
-        news_data = data.get('newsapi', {})
-        
         organized_data[competitor] = {
-            'details': news_data,
-            'products': extract_products(news_data),
-            'market_trends': []
+            'article_ids': data.get('article_ids', []),
+            'products': extract_products(competitor_articles[competitor], title_entities),
+            'market_trends': list(keyword_trends)
         }
-        
-        for keyword, news_data in keyword_data.items():
-            trends = extract_market_trends(news_data.get('newsapi', {}))
-            if trends:
-                organized_data[competitor]['market_trends'].append({
-                    'keyword': keyword,
-                    'trends': trends
-                })
     
     return organized_data
 
-# Collect data using different APIs
-def collect_data(competitor_names, industry_keywords):
-    # Load API keys
-    api_keys = load_api_keys()
+# Keep one representative per cluster of near-duplicate articles, with its cluster size.
+# Only `new_ids` are fingerprinted; given a store, they are compared with each other and with
+# the stored articles sharing an LSH bucket instead of re-hashing the whole corpus.
+# Returns ({ID: representative}, {ID: signature}) for the articles to add to the LSH index.
+def collapse_near_duplicates(articles, entries, new_ids, store=None):
+    signatures = {i: fingerprint(articles[i]) for i in new_ids}
+    known = {}
+    if store is not None:
+        # Articles stored before the LSH index existed are fingerprinted once
+        backfill = {i: fingerprint(articles[i]) for i in store.unfingerprinted_ids() if i in articles}
+        keys = {key for signature in signatures.values() if signature is not None for key in band_keys(signature)}
+        known = {i: signature for i, signature in backfill.items() if signature is not None}
+        known.update(store.fingerprint_candidates(keys))
+        signatures.update(backfill)
+    clusters = cluster_near_duplicates({i: articles[i] for i in new_ids}, signatures=signatures, known=known)
+    representative = {}
+    for rep, members in clusters.items():
+        articles[rep]['cluster_size'] = articles[rep].get('cluster_size', 1) + len(members) - 1
+        for member in members:
+            representative[member] = rep
+        for member in members[1:]:
+            del articles[member]
+    for entry in entries:
+        for field in ('article_ids', 'new_article_ids'):
+            if field in entry:
+                entry[field] = list(dict.fromkeys(representative.get(i, i) for i in entry[field]))
+    collapsed = sum(len(members) - 1 for members in clusters.values())
+    print(f"Near-duplicates collapsed: {collapsed} of {len(representative)} articles compared")
+    return representative, {i: signature for i, signature in signatures.items() if i in articles}
+
+# Fold the organized view of newly collected articles into the previous one
+def merge_organized_details(previous, delta):
+    merged = {}
+    # Keyword trends are the same for every competitor, so one added in this run starts from them too
+    shared_trends = next((details.get('market_trends', []) for details in previous.values()), [])
+    for competitor, details in delta.items():
+        before = previous.get(competitor, {})
+        trends = {item['keyword']: list(item['trends']) for item in before.get('market_trends', shared_trends)}
+        for item in details['market_trends']:
+            trends.setdefault(item['keyword'], []).extend(item['trends'])
+        merged[competitor] = {
+            **details,
+            'products': before.get('products', []) + details['products'],
+            'market_trends': [{'keyword': k, 'trends': t} for k, t in trends.items()]
+        }
+    return merged
+
+# Crawl pages concurrently, revalidating the ones an earlier run stored; returns {url: result}
+def crawl_pages(urls, store):
+    crawler = Crawler(transport=CRAWL_TRANSPORT)
+    try:
+        results = crawler.crawl(urls, cache=store.get_pages(urls))
+    finally:
+        crawler.close()
+    store.save_pages({url: page for url, page in results.items() if page['status'] in ('fetched', 'not_modified')})
+    print(f"Crawler: {crawler.stats}")
+    return results
+
+class NewsAPISource(Source):
+    """NewsAPI /v2/everything through the shared cache, rate limiter and hedger.
+
+    Incremental runs pass the stored watermarks so each query only asks for
+    articles newer than the last run; coalesce=True packs competitor names
+    into OR queries, each paged through up to COALESCED_BATCH_PAGES pages.
+    Names a batch found no article for are queried on their own, within
+    what is left of the deadline, and listed in `names_without_hits`.
+    """
+
+    name = 'newsapi'
+
+    def __init__(self, api_key, max_workers=DEFAULT_MAX_WORKERS, coalesce=False, watermarks=None):
+        super().__init__(max_workers)
+        self.api_key = api_key
+        self.coalesce = coalesce
+        self.watermarks = watermarks or {}
+        self.names_without_hits = []
+
+    def collect(self, competitor_names, keywords, deadline=None):
+        started = time.monotonic()
+        # Optionally pack competitor names into OR queries, one request per batch
+        batches = coalesce_queries(competitor_names) if self.coalesce else {name: [name] for name in competitor_names}
+        queries = list(batches) + list(keywords)
+        query_params = {}
+        for query in queries:
+            members = batches.get(query, [query])
+            if all(name in self.watermarks for name in members):
+                query_params[query] = {'from': min(self.watermarks[name] for name in members)}
+        
+        # Fetch competitor and keyword queries concurrently over one session, for at most `deadline` seconds.
+        # Incremental runs skip the response cache: a query's from= only moves once new articles
+        # arrive, so a cached response would hide them until it expired.
+        budgets = {query: COALESCED_BATCH_PAGES * MAX_PAGE_SIZE for query in batches if self.coalesce}
+        results = fetch_queries(queries, self.api_key, max_workers=self.max_workers, query_params=query_params,
+                                deadline=deadline, use_cache=not self.watermarks, query_budgets=budgets)
+        if self.coalesce:
+            self.names_without_hits = []
+            for query, names in batches.items():
+                batch_result = results.pop(query)
+                results.update(demultiplex(batch_result, names))
+                if batch_result.get('status') == 'ok':
+                    self.names_without_hits += [name for name in names if not results[name]['articles']]
+            print(f"Coalesced {len(competitor_names)} competitor queries into {len(batches)} batches")
+            remaining = None if deadline is None else deadline - (time.monotonic() - started)
+            if self.names_without_hits and (remaining is None or remaining > 0):
+                # More popular names may have filled the batch's pages; ask for these on their own
+                print(f"Coalesced batches found no articles for: {', '.join(self.names_without_hits)}; "
+                      f"querying them separately")
+                results.update(fetch_queries(
+                    self.names_without_hits, self.api_key, max_workers=self.max_workers,
+                    query_params={name: {'from': self.watermarks[name]} for name in self.names_without_hits
+                                  if name in self.watermarks},
+                    deadline=remaining, use_cache=not self.watermarks))
+        if response_cache is not None:
+            print(f"NewsAPI cache: {response_cache.stats()}")
+        print(f"NewsAPI rate limiter: {rate_limiter.stats()}")
+        print(f"NewsAPI in-flight coalescing: {inflight_requests.stats()}")
+        print(f"NewsAPI hedging: {hedger.stats()}")
+        print(f"NewsAPI circuit: {newsapi_breaker.stats()}")
+        return results
+
+# Collect data from NewsAPI and any extra sources (sources.RSSSource, sources.LocalDirectorySource, ...)
+def collect_data(competitor_names, industry_keywords, urls=None, max_workers=DEFAULT_MAX_WORKERS,
+                 incremental=False, coalesce=False, crawl=False, deadline=None, sources=None,
+                 newsapi=True):
+    started = time.monotonic()
+    
+    # In incremental mode, start from the stored articles and fetch only what is newer
+    with open_store() as store:
+        previous = store.load_collection() if incremental else {}
+    watermarks = previous.get('watermarks', {})
     
-    data = {}
+    # Query every source in parallel, each with its own concurrency, for at most `deadline` seconds
+    if deadline is None:
+        n_queries = len(dict.fromkeys([*competitor_names, *industry_keywords]))
+        deadline = default_deadline(n_queries) if newsapi else COLLECTION_DEADLINE
+    sources = list(sources or [])
+    newsapi_source = None
+    if newsapi:
+        newsapi_source = NewsAPISource(load_api_keys()['newsapi'], max_workers, coalesce, watermarks)
+        sources.insert(0, newsapi_source)
+    source_results, source_report = collect_from_sources(sources, competitor_names, industry_keywords, deadline)
+    for name, timing in source_report.items():
+        print(f"Source {name}: {timing['articles']} articles in {timing['seconds']}s")
+    queries = list(dict.fromkeys([*competitor_names, *industry_keywords]))
+    results = {query: project_response(news_data, article_fields)
+               for query, news_data in merge_source_results(source_results, queries).items()}
+    missing = [query for query in queries
+               if any(r.get(query, {}).get('code') in UNAVAILABLE_CODES for r in source_results.values())]
+    # A full run that left queries out merges into the store instead of replacing it, and those
+    # queries keep what earlier runs stored for them
+    replace = not incremental and not missing
+    if not incremental and missing:
+        with open_store() as store:
+            stored = store.load_collection()
+        previous = {
+            'articles': stored['articles'],
+            'aliases': stored['aliases'],
+            **{source: {query: entry for query, entry in stored[source].items() if query in missing}
+               for source in ('competitor_data', 'keyword_data')}
+        }
+    
+    # Map every query result onto shared IDs, storing each unique article once
+    index = ArticleIndex()
+    index.load(previous.get('articles', {}), previous.get('aliases'))
+    known_ids = set(index.articles)
+    
+    def query_entry(query, previous_entry):
+        ids = index.add_many(_articles(results[query]))
+        before = previous_entry.get('article_ids', [])
+        seen = set(before)
+        return {
+            'newsapi': results[query],  # All sources merged, in the NewsAPI response shape
+            'article_ids': list(dict.fromkeys(before + ids)),
+            # New to this query, even if another query stored them earlier
+            'new_article_ids': [i for i in dict.fromkeys(ids) if i not in seen]
+        }
     
     # Collect data using NewsAPI for competitors
     competitor_data = {}
     for name in competitor_names:
-        competitor_data[name] = {
-            'newsapi': newsapi_search(name, api_keys['newsapi'])
-        }
+        competitor_data[name] = query_entry(name, previous.get('competitor_data', {}).get(name, {}))
     
     # Collect data from NewsAPI for industry trends
     keyword_data = {}
     for keyword in industry_keywords:
-        keyword_data[keyword] = {
-            'newsapi': newsapi_search(keyword, api_keys['newsapi'])
-        }
+        keyword_data[keyword] = query_entry(keyword, previous.get('keyword_data', {}).get(keyword, {}))
+    print(f"Article dedup: {index.stats()}")
+    # Runs merging into the store fingerprint only the new articles and look the rest up in its LSH index
+    new_ids = [i for i in index.articles if i not in known_ids]
+    with open_store() as store:
+        representative, fingerprints = collapse_near_duplicates(
+            index.articles, [*competitor_data.values(), *keyword_data.values()], new_ids,
+            None if replace else store)
+    index.add_aliases(representative)
+    for source, entries in (('competitor_data', competitor_data), ('keyword_data', keyword_data)):
+        for query, entry in entries.items():
+            # New rewrites of a story the query already had collapse onto it and are not new work
+            before = set(previous.get(source, {}).get(query, {}).get('article_ids', []))
+            entry['new_article_ids'] = [i for i in entry['new_article_ids'] if i not in before]
     
-    # Save the collected data to a JSON file
-    save_data_to_json({
-        'competitor_data': competitor_data,
-        'keyword_data': keyword_data
-    })
+    # Crawl competitor websites, and with crawl=True the new competitor articles, for their full text
+    site_urls = {name: url for name, url in (urls or {}).items() if name in competitor_data and url}
+    crawl_urls = list(site_urls.values())
+    if crawl:
+        crawl_urls += [index.articles[i].get('url') for entry in competitor_data.values()
+                       for i in entry['new_article_ids'] if i not in known_ids]
+    
+    # Save the collected articles to the article store, one row per unique article
+    with open_store() as store:
+        pages = crawl_pages(crawl_urls, store) if crawl_urls else {}
+        for name, url in site_urls.items():
+            page = pages.get(url, {})
+            if page.get('status') not in ('fetched', 'not_modified'):
+                continue
+            # The website is kept as one more article of its competitor; analysis reads its text
+            site_id = index.add({'url': url, 'title': page.get('title') or url})
+            entry = competitor_data[name]
+            if site_id not in entry['article_ids']:
+                entry['article_ids'].append(site_id)
+                entry['new_article_ids'].append(site_id)
+        # Watermarks only steer NewsAPI's from= parameter, so only its results move them
+        store.save_collection(competitor_data, keyword_data, index.articles, index.aliases,
+                              update_watermarks(watermarks, source_results.get('newsapi', {})),
+                              replace=replace, fingerprints=fingerprints)
+    print(f"Articles saved to {store.path}")
     
     # Extract and organize relevant details
-    organized_details = extract_competitor_details(competitor_data, keyword_data)
+    if incremental and previous.get('articles'):
+        # Only the new articles go through NER; their views are merged into the last run's
+        delta_view = lambda data: {**data, 'article_ids': data['new_article_ids']}
+        delta_details = extract_competitor_details(
+            {name: delta_view(data) for name, data in competitor_data.items()},
+            {keyword: delta_view(data) for keyword, data in keyword_data.items()},
+            index.articles
+        )
+        for name, details in delta_details.items():
+            details['article_ids'] = competitor_data[name]['article_ids']
+        organized_details = merge_organized_details(
+            load_data_from_json('organized_details.json') or {}, delta_details)
+    else:
+        organized_details = extract_competitor_details(competitor_data, keyword_data, index.articles)
+    for name, details in organized_details.items():
+        details['new_article_ids'] = competitor_data[name]['new_article_ids']
     
     # Save the organized details to a JSON file
     save_data_to_json(organized_details, filename='organized_details.json')
     
+    # Report which queries missed the deadline, failed or hit an open circuit; their earlier results (if any) were kept
+    report = {
+        'deadline_seconds': deadline,
+        'elapsed_seconds': round(time.monotonic() - started, 3),
+        'missing_queries': missing,
+        # Competitors a coalesced batch returned nothing for, and which were queried on their own
+        'coalesced_names_without_hits': newsapi_source.names_without_hits if newsapi_source else [],
+        'sources': source_report,
+        'hedging': hedger.stats(),
+        'circuit': newsapi_breaker.stats()
+    }
+    if missing:
+        print(f"Partial results: {len(missing)} queries got no new results: {', '.join(missing)}")
+    save_data_to_json(report, filename='collection_report.json')
+    
     return organized_details
 
 # Example usage
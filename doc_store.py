@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+import uuid
+
+DOC_STORE_DIR = os.path.join('output', 'docs')
+DOCS_PER_SHARD = 1000
+INDEX_FILE = 'index.json'
+# Shards with less than this fraction of their docs still indexed are rewritten by retain()
+MIN_LIVE_FRACTION = 0.5
+
+
+class DocStore:
+    """Parsed spaCy Docs kept in DocBin shards next to the article store.
+
+    An index maps each article ID to its shard, its position in the shard and
+    the key of the text it was parsed from, all under one model fingerprint;
+    docs parsed by another model are discarded. Shards are read lazily, one
+    at a time, so new extraction functions can run over the whole corpus
+    without re-running the model or holding every doc in memory. Writers may
+    run concurrently: shard names are unique and the index is shared under
+    a lock.
+    """
+
+    def __init__(self, directory=DOC_STORE_DIR, shard_size=DOCS_PER_SHARD):
+        self.directory = directory
+        self.shard_size = shard_size
+        self._model = None
+        self._docs = None
+        self._shards = None  # {shard: docs written to it}
+        self._lock = threading.RLock()
+
+    def _load_index(self):
+        with self._lock:
+            if self._docs is None:
+                path = os.path.join(self.directory, INDEX_FILE)
+                index = {'model': None, 'docs': {}}
+                if os.path.exists(path):
+                    with open(path) as f:
+                        index = json.load(f)
+                self._model = index['model']
+                self._docs = index['docs']
+                self._shards = index.get('shards', {})
+            return self._docs
+
+    def _save_index(self):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, INDEX_FILE)
+            with open(f"{path}.tmp", 'w') as f:
+                json.dump({'model': self._model, 'docs': self._docs, 'shards': self._shards}, f,
+                          separators=(',', ':'))
+            os.replace(f"{path}.tmp", path)
+
+    def __len__(self):
+        return len(self._load_index())
+
+    # Whether the doc stored for an article was parsed by `model` from the text with this key
+    def has(self, article_id, text_key, model):
+        entry = self._load_index().get(article_id)
+        return entry is not None and self._model == model and entry[2] == text_key
+
+    def writer(self, model):
+        return DocWriter(self, model)
+
+    def _vocab(self):
+        import spacy
+        return spacy.blank(self._model.split('_', 1)[0] if self._model else 'en').vocab
+
+    # Lazily yield (article ID, Doc) for the given IDs (all when None), one shard at a time
+    def iter_docs(self, ids=None, vocab=None):
+        from spacy.tokens import DocBin
+        if vocab is None:
+            vocab = self._vocab()
+        by_shard = {}
+        with self._lock:
+            docs = self._load_index()
+            for i in (list(docs) if ids is None else dict.fromkeys(ids)):
+                if i in docs:
+                    shard, position, _ = docs[i]
+                    by_shard.setdefault(shard, {})[position] = i
+        for shard in sorted(by_shard):
+            wanted = by_shard[shard]
+            doc_bin = DocBin().from_disk(os.path.join(self.directory, shard))
+            for position, doc in enumerate(doc_bin.get_docs(vocab)):
+                if position in wanted:
+                    yield wanted[position], doc
+
+    # Keep only the docs of `article_ids`, e.g. the articles the article store still holds. Shards
+    # left with less than `min_live` of their docs indexed, by dropped articles or by texts parsed
+    # again into newer shards, are rewritten with their indexed docs; returns the docs dropped.
+    def retain(self, article_ids, min_live=MIN_LIVE_FRACTION):
+        from spacy.tokens import DocBin
+        keep = set(article_ids)
+        with self._lock:
+            docs = self._load_index()
+            dropped = [i for i in docs if i not in keep]
+            for i in dropped:
+                del docs[i]
+            live = {}
+            for i, (shard, position, _) in docs.items():
+                live.setdefault(shard, {})[position] = i
+            rewritten = 0
+            for shard, wanted in live.items():
+                path = os.path.join(self.directory, shard)
+                if shard not in self._shards:
+                    self._shards[shard] = len(DocBin().from_disk(path))  # Shard from an older index
+                if len(wanted) >= min_live * self._shards[shard]:
+                    continue
+                doc_bin = DocBin()
+                for position, doc in enumerate(DocBin().from_disk(path).get_docs(self._vocab())):
+                    if position in wanted:
+                        docs[wanted[position]][1] = len(doc_bin)
+                        doc_bin.add(doc)
+                name = f"shard-{uuid.uuid4().hex}.spacy"
+                doc_bin.to_disk(os.path.join(self.directory, name))
+                self._shards[name] = len(doc_bin)
+                for i in wanted.values():
+                    docs[i][0] = name
+                rewritten += 1
+            if dropped or rewritten:
+                self._save_index()
+                self.compact()
+        return len(dropped)
+
+    # Delete shards no longer referenced by the index
+    def compact(self):
+        removed = 0
+        with self._lock:
+            live = {entry[0] for entry in self._load_index().values()}
+            for shard in [shard for shard in self._shards if shard not in live]:
+                del self._shards[shard]
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name.endswith('.spacy') and name not in live:
+                        os.remove(os.path.join(self.directory, name))
+                        removed += 1
+        return removed
+
+
+class DocWriter:
+    """Appends parsed docs to new shards of a DocStore; close() publishes them."""
+
+    def __init__(self, store, model):
+        from spacy.tokens import DocBin
+        self._DocBin = DocBin
+        self.store = store
+        self.model = model
+        with store._lock:
+            docs = store._load_index()
+            if store._model != model:
+                # Docs parsed by another model must not be mixed with these
+                docs.clear()
+                store._model = model
+        os.makedirs(store.directory, exist_ok=True)
+        self._bin = DocBin()
+        self._entries = []
+        self.written = 0
+
+    def add(self, article_id, text_key, doc):
+        self._bin.add(doc)
+        self._entries.append((article_id, text_key))
+        if len(self._entries) >= self.store.shard_size:
+            self.flush()
+
+    # Add docs serialized elsewhere (e.g. by a worker process); entries are (ID, text key) in doc order
+    def add_serialized(self, entries, data):
+        self._bin.merge(self._DocBin().from_bytes(data))
+        self._entries.extend(entries)
+        if len(self._entries) >= self.store.shard_size:
+            self.flush()
+
+    def flush(self):
+        if not self._entries:
+            return
+        # Writers sharing a store never pick the same name; the shard is indexed before compact() can see it
+        name = f"shard-{uuid.uuid4().hex}.spacy"
+        with self.store._lock:
+            self._bin.to_disk(os.path.join(self.store.directory, name))
+            for position, (i, text_key) in enumerate(self._entries):
+                self.store._docs[i] = [name, position, text_key]
+            self.store._shards[name] = len(self._entries)
+        self.written += len(self._entries)
+        self._bin = self._DocBin()
+        self._entries = []
+
+    def close(self):
+        self.flush()
+        with self.store._lock:
+            self.store._save_index()
+            self.store.compact()
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Default cache settings
+ENTITY_CACHE_PATH = os.path.join('cache', 'entities.db')
+ENTITY_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    key TEXT PRIMARY KEY,
+    entities TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entities_used_at ON entities (used_at);
+"""
+
+
+# Identity of a loaded pipeline; entities cached under one model are never served for another
+def model_fingerprint(nlp):
+    import spacy
+    meta = nlp.meta
+    return f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}/spacy-{spacy.__version__}"
+
+
+# Cache key for a text parsed by a model: hash of the model plus the whitespace-normalized text
+def make_entity_key(text, model):
+    normalized = ' '.join(text.split())
+    return hashlib.sha256(f"{model}\x1f{normalized}".encode('utf-8')).hexdigest()
+
+
+class EntityCache:
+    """SQLite map from text hash to the entities a model extracted from it.
+
+    Entries remember when they were last read; once the stored entities
+    exceed `max_bytes`, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path=ENTITY_CACHE_PATH, max_bytes=ENTITY_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    # Connection opened on first use, so importing the analysis stage creates no files
+    def _connection(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    # Cached entities for the given keys: {key: entities}; keys not cached are left out
+    def get_many(self, keys):
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, entities FROM entities WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                found.update((key, json.loads(entities)) for key, entities in rows)
+            if found:
+                with conn:
+                    now = time.time()
+                    conn.executemany("UPDATE entities SET used_at = ? WHERE key = ?", ((now, k) for k in found))
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items):
+        rows = []
+        now = time.time()
+        for key, entities in items.items():
+            blob = json.dumps(entities, separators=(',', ':'))
+            rows.append((key, blob, len(blob), now))
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?)", rows)
+                self._evict(conn)
+
+    def set(self, key, entities):
+        self.set_many({key: entities})
+
+    # Drop least recently used entries until the cache is back under its size cap
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entities").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% of the cap so the next writes do not trigger another pass
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entities ORDER BY used_at"):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        conn.executemany("DELETE FROM entities WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM entities")
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / total if total else 0.0
+            }
@@ -0,0 +1,111 @@
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+HEDGE_PERCENTILE = 0.95
+LATENCY_WINDOW = 500  # Recent call latencies the percentile is taken over
+MIN_SAMPLES = 20  # Calls observed before hedging starts
+HEDGE_WORKERS = 32
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class LatencyTracker:
+    """Thread-safe rolling window of call latencies."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    # Latency below which `fraction` of recent calls finished, or None with too few samples
+    def percentile(self, fraction, min_samples=MIN_SAMPLES):
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Hedger:
+    """Bounds tail latency by racing a duplicate of calls that run long.
+
+    A call still unanswered after the tracked p95 latency gets one hedged
+    duplicate; whichever answers first wins. A call given a budget raises
+    DeadlineExceeded once the budget is spent, leaving the losers to finish
+    in the background. With `acquire` (e.g. a rate limiter's wait_for_turn),
+    each attempt first waits for its turn, and neither the latency window
+    nor the budget count that wait.
+    """
+
+    def __init__(self, percentile=HEDGE_PERCENTILE, min_samples=MIN_SAMPLES, max_workers=HEDGE_WORKERS,
+                 tracker=None):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.tracker = tracker or LatencyTracker()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadlines_exceeded = 0
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _timed(self, send, acquire=None):
+        if acquire is not None:
+            acquire()
+        start = time.monotonic()
+        result = send()
+        self.tracker.record(time.monotonic() - start)
+        return result
+
+    # Return send()'s result, hedging it past p95 and giving up after `budget` seconds
+    def call(self, send, budget=None, acquire=None):
+        self._count('calls')
+        if acquire is not None:
+            acquire()  # Queueing for a turn is not latency, so the clock starts after it
+        deadline = None if budget is None else time.monotonic() + budget
+        remaining = lambda: None if deadline is None else max(0.0, deadline - time.monotonic())
+        primary = self._pool.submit(self._timed, send)
+        pending = {primary}
+        hedge_after = self.tracker.percentile(self.percentile, self.min_samples)
+        if hedge_after is not None and (deadline is None or hedge_after < remaining()):
+            if not wait(pending, timeout=hedge_after).done:
+                self._count('hedged')
+                pending.add(self._pool.submit(self._timed, send, acquire))
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        if error is not None and not pending:
+            raise error
+        self._count('deadlines_exceeded')
+        raise DeadlineExceeded(f"No response within {budget}s")
+
+    def stats(self):
+        p95 = self.tracker.percentile(self.percentile, self.min_samples)
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'hedged': self.hedged,
+                'hedge_wins': self.hedge_wins,
+                'deadlines_exceeded': self.deadlines_exceeded,
+                'p95_seconds': None if p95 is None else round(p95, 3)
+            }
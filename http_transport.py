@@ -0,0 +1,272 @@
+import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import pycurl
+except ImportError:  # Only CurlMultiTransport needs it
+    pycurl = None
+
+DEFAULT_MAX_CONNECTIONS = 64
+DEFAULT_PER_HOST = 6
+DEFAULT_TIMEOUT = (5, 20)  # (connect, read) seconds, as requests takes them
+DEFAULT_MAX_TRANSFERS = 512  # Transfers CurlMultiTransport keeps in flight at once
+DNS_CACHE_SECONDS = 600
+CHUNK_SIZE = 16 * 1024
+
+
+class Response:
+    """The parts of a requests.Response the pipeline relies on, for any backend.
+
+    `error` holds the requests exception a failed transfer raised instead of
+    producing a response; `truncated` is set when the body hit max_bytes.
+    """
+
+    def __init__(self, url, status_code=0, headers=None, content=b'', reason='', error=None, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.reason = reason
+        self.error = error
+        self.truncated = truncated
+
+    @property
+    def ok(self):
+        return self.error is None and 200 <= self.status_code < 400
+
+    # Charset from Content-Type, defaulting to UTF-8 rather than requests' ISO-8859-1
+    @property
+    def encoding(self):
+        content_type = self.headers.get('Content-Type', '')
+        for part in content_type.split(';')[1:]:
+            key, _, value = part.strip().partition('=')
+            if key.lower() == 'charset' and value:
+                return value.strip('"\'')
+        return 'utf-8'
+
+    @property
+    def text(self):
+        try:
+            return self.content.decode(self.encoding, errors='replace')
+        except LookupError:
+            return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def _full_url(url, params):
+    if not params:
+        return url
+    return f"{url}{'&' if urlsplit(url).query else '?'}{urlencode(params)}"
+
+
+class RequestsTransport:
+    """Default backend: a thread pool over one keep-alive requests.Session.
+
+    Each host gets at most `per_host` simultaneous connections; bodies are read
+    in chunks and cut off at max_bytes.
+    """
+
+    name = 'requests'
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, per_host=DEFAULT_PER_HOST,
+                 timeout=DEFAULT_TIMEOUT, user_agent=None):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = requests.Session()
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=per_host)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, host):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    # One GET; raises requests exceptions like session.get does
+    def get(self, url, params=None, headers=None, max_bytes=None):
+        with self._host_slot(urlsplit(url).netloc):
+            with self.session.get(url, params=params, headers=headers, timeout=self.timeout,
+                                  stream=True) as response:
+                body = bytearray()
+                truncated = False
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    body += chunk
+                    if max_bytes is not None and len(body) > max_bytes:
+                        del body[max_bytes:]
+                        truncated = True
+                        break
+                return Response(response.url, response.status_code, response.headers, bytes(body),
+                                response.reason, truncated=truncated)
+
+    # GET every {'url', 'params', 'headers'} request; returns Responses in the same order
+    def fetch_many(self, requests_, max_bytes=None):
+        requests_ = list(requests_)
+        if not requests_:
+            return []
+
+        def fetch(request):
+            try:
+                return self.get(request['url'], request.get('params'), request.get('headers'), max_bytes)
+            except requests.RequestException as e:
+                return Response(request['url'], reason=str(e), error=e)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_connections, len(requests_))) as pool:
+            return list(pool.map(fetch, requests_))
+
+    def close(self):
+        self.session.close()
+
+
+class CurlMultiTransport:
+    """libcurl multi-handle backend driving many transfers from a single thread.
+
+    HTTPS transfers negotiate HTTP/2 and wait to multiplex onto an open
+    connection to the same host instead of opening another; connections and
+    resolved addresses are cached by the multi handle and reused across calls.
+    One thread drives the handle at a time, so concurrent callers take turns.
+    """
+
+    name = 'curl'
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, per_host=DEFAULT_PER_HOST,
+                 timeout=DEFAULT_TIMEOUT, user_agent=None, http2=True, max_transfers=DEFAULT_MAX_TRANSFERS,
+                 dns_cache_seconds=DNS_CACHE_SECONDS):
+        if pycurl is None:
+            raise ImportError("CurlMultiTransport needs pycurl; install it with `pip install pycurl`")
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.http2 = http2
+        self.max_transfers = max_transfers
+        self.dns_cache_seconds = dns_cache_seconds
+        self.multi = pycurl.CurlMulti()
+        self.multi.setopt(pycurl.M_MAX_HOST_CONNECTIONS, per_host)
+        self.multi.setopt(pycurl.M_MAX_TOTAL_CONNECTIONS, max_connections)
+        if http2:
+            self.multi.setopt(pycurl.M_PIPELINING, pycurl.PIPE_MULTIPLEX)
+        self._idle = []  # Easy handles kept for reuse
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'connections': 0}
+
+    def _prepare(self, curl, request, max_bytes):
+        state = {'request': request, 'body': BytesIO(), 'headers': {}, 'reason': '', 'truncated': False}
+
+        def write(chunk):
+            if max_bytes is not None and state['body'].tell() + len(chunk) > max_bytes:
+                state['body'].write(chunk[:max_bytes - state['body'].tell()])
+                state['truncated'] = True
+                return 0  # Aborts the transfer with E_WRITE_ERROR
+            state['body'].write(chunk)
+
+        def header(line):
+            line = line.decode('iso-8859-1').rstrip('\r\n')
+            if line.startswith('HTTP/'):
+                # A new status line starts the headers of a redirect target or of the final response
+                state['headers'] = {}
+                state['reason'] = line.split(' ', 2)[2] if line.count(' ') >= 2 else ''
+            elif ':' in line:
+                key, _, value = line.partition(':')
+                state['headers'][key.strip()] = value.strip()
+
+        curl.reset()
+        curl.setopt(pycurl.URL, _full_url(request['url'], request.get('params')))
+        curl.setopt(pycurl.WRITEFUNCTION, write)
+        curl.setopt(pycurl.HEADERFUNCTION, header)
+        curl.setopt(pycurl.FOLLOWLOCATION, True)
+        curl.setopt(pycurl.MAXREDIRS, 10)
+        curl.setopt(pycurl.NOSIGNAL, True)
+        curl.setopt(pycurl.ENCODING, '')  # Accept and decode every encoding libcurl supports
+        curl.setopt(pycurl.DNS_CACHE_TIMEOUT, self.dns_cache_seconds)
+        connect_timeout, read_timeout = self.timeout
+        curl.setopt(pycurl.CONNECTTIMEOUT_MS, int(connect_timeout * 1000))
+        # Like requests' read timeout: give up after read_timeout seconds without data
+        curl.setopt(pycurl.LOW_SPEED_LIMIT, 1)
+        curl.setopt(pycurl.LOW_SPEED_TIME, max(1, int(read_timeout)))
+        if self.http2:
+            curl.setopt(pycurl.HTTP_VERSION, pycurl.CURL_HTTP_VERSION_2TLS)
+            curl.setopt(pycurl.PIPEWAIT, True)
+        if self.user_agent:
+            curl.setopt(pycurl.USERAGENT, self.user_agent)
+        headers = request.get('headers') or {}
+        curl.setopt(pycurl.HTTPHEADER, [f"{key}: {value}" for key, value in headers.items()])
+        return state
+
+    def _finish(self, curl, state, error):
+        request = state['request']
+        self.stats['requests'] += 1
+        self.stats['connections'] += curl.getinfo(pycurl.NUM_CONNECTS)
+        if error is not None and not (error[0] == pycurl.E_WRITE_ERROR and state['truncated']):
+            self.stats['errors'] += 1
+            errno, message = error
+            exc_type = requests.Timeout if errno == pycurl.E_OPERATION_TIMEDOUT else requests.ConnectionError
+            return Response(request['url'], reason=message, error=exc_type(message))
+        return Response(curl.getinfo(pycurl.EFFECTIVE_URL), curl.getinfo(pycurl.RESPONSE_CODE), state['headers'],
+                        state['body'].getvalue(), state['reason'], truncated=state['truncated'])
+
+    # GET every {'url', 'params', 'headers'} request; returns Responses in the same order
+    def fetch_many(self, requests_, max_bytes=None):
+        pending = deque(enumerate(requests_))
+        responses = [None] * len(pending)
+        active = {}
+        with self._lock:
+            while pending or active:
+                while pending and len(active) < self.max_transfers:
+                    position, request = pending.popleft()
+                    curl = self._idle.pop() if self._idle else pycurl.Curl()
+                    active[curl] = (position, self._prepare(curl, request, max_bytes))
+                    self.multi.add_handle(curl)
+                while self.multi.perform()[0] == pycurl.E_CALL_MULTI_PERFORM:
+                    pass
+                while True:
+                    queued, succeeded, failed = self.multi.info_read()
+                    done = [(curl, None) for curl in succeeded]
+                    done += [(curl, (errno, message)) for curl, errno, message in failed]
+                    for curl, error in done:
+                        position, state = active.pop(curl)
+                        responses[position] = self._finish(curl, state, error)
+                        self.multi.remove_handle(curl)
+                        self._idle.append(curl)
+                    if not queued:
+                        break
+                if active:
+                    self.multi.select(1.0)
+        return responses
+
+    # One GET; raises requests exceptions like session.get does
+    def get(self, url, params=None, headers=None, max_bytes=None):
+        response = self.fetch_many([{'url': url, 'params': params, 'headers': headers}], max_bytes)[0]
+        if response.error is not None:
+            raise response.error
+        return response
+
+    def close(self):
+        with self._lock:
+            for curl in self._idle:
+                curl.close()
+            self._idle = []
+            self.multi.close()
+
+
+TRANSPORTS = {'requests': RequestsTransport, 'curl': CurlMultiTransport}
+
+
+# Build a transport by backend name ('requests' or 'curl')
+def make_transport(name='requests', **kwargs):
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{name}'; expected one of {', '.join(TRANSPORTS)}")
+    return TRANSPORTS[name](**kwargs)
@@ -0,0 +1,109 @@
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 64  # MinHash signature length
+LSH_BANDS = 16  # NUM_PERM / LSH_BANDS rows per band
+SIMILARITY_THRESHOLD = 0.6  # Estimated Jaccard similarity treated as the same story
+
+_TOKEN_RE = re.compile(r'\w+')
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+
+# Word unigram and bigram shingles of a text
+def shingles(text):
+    tokens = _TOKEN_RE.findall(text.casefold())
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+# MinHash signature of a set of shingles, or None if it is empty
+def minhash(features):
+    if not features:
+        return None
+    hashes = np.fromiter((zlib.crc32(f.encode('utf-8')) for f in features),
+                         dtype=np.uint64, count=len(features))
+    # (a * x + b) mod p stays below 2**63, so uint64 arithmetic cannot overflow
+    return ((np.outer(hashes, _PERM_A) + _PERM_B) % _PRIME).min(axis=0)
+
+
+# Article fields a near-duplicate comparison is based on
+FINGERPRINT_FIELDS = ('title', 'description')
+
+
+def _fingerprint_text(article):
+    return ' '.join(article.get(field) or '' for field in FINGERPRINT_FIELDS)
+
+
+# MinHash signature of an article's fingerprint fields, or None if they are empty
+def fingerprint(article):
+    return minhash(shingles(_fingerprint_text(article)))
+
+
+# LSH bucket keys of a signature, one per band
+def band_keys(signature, bands=LSH_BANDS):
+    rows = NUM_PERM // bands
+    return [bytes([band]) + signature[band * rows:(band + 1) * rows].tobytes() for band in range(bands)]
+
+
+# Group near-duplicate articles; returns {representative ID: [member IDs]}
+def cluster_near_duplicates(articles, threshold=SIMILARITY_THRESHOLD, bands=LSH_BANDS, signatures=None,
+                            known=None):
+    """Cluster `articles` ({ID: article}) by MinHash of title + description.
+
+    Signatures are split into bands and only articles that share a band
+    bucket are compared. Bucket members are grouped by cluster and a new
+    article is compared with each other cluster only until one member
+    matches, so a story syndicated thousands of times stays linear. The
+    first article of each cluster, in input order, is its representative.
+
+    `signatures` ({ID: signature}) spares recomputing those already known.
+    `known` ({ID: signature}) holds articles deduplicated by an earlier run,
+    e.g. stored ones sharing a bucket with the new articles: they come first
+    in order and are bucketed without being compared with each other.
+    """
+    known = known or {}
+    signatures = signatures or {}
+    ids = [*known, *(i for i in articles if i not in known)]
+    signatures = [known[i] if i in known else signatures[i] if i in signatures else fingerprint(articles[i])
+                  for i in ids]
+    parent = list(range(len(ids)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    buckets = {}
+    for n, signature in enumerate(signatures):
+        if signature is None:
+            continue  # No text to compare
+        for key in band_keys(signature, bands):
+            bucket = buckets.get(key)  # {cluster root: members in this bucket}
+            if bucket is None:
+                buckets[key] = {find(n): [n]}
+                continue
+            if n < len(known):
+                bucket[n] = [n]  # Known articles are distinct stories already
+                continue
+            if any(find(root) != root for root in bucket):
+                # Clusters merged through other buckets since; regroup their members
+                regrouped = {}
+                for root, members in bucket.items():
+                    regrouped.setdefault(find(root), []).extend(members)
+                bucket = buckets[key] = regrouped
+            own = find(n)
+            for root, members in list(bucket.items()):
+                if root != own and any(np.mean(signature == signatures[other]) >= threshold for other in members):
+                    parent[max(root, own)] = min(root, own)  # Earliest article stays the root
+                    own = min(root, own)
+            bucket.setdefault(own, []).append(n)
+
+    clusters = {}
+    for n, article_id in enumerate(ids):
+        clusters.setdefault(ids[find(n)], []).append(article_id)
+    return clusters
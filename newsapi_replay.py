@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from response_cache import make_cache_key
+
+FIXTURE_DIR = os.path.join('fixtures', 'newsapi')
+
+# Parameters the replay server applies itself instead of keying fixtures on them
+SERVED_PARAMS = {'q', 'apiKey', 'page', 'pageSize', 'from', 'to'}
+
+
+# Fixture key for a query; paging and date-window parameters are applied at replay time
+def fixture_key(query, params=None):
+    return make_cache_key(query, {k: v for k, v in (params or {}).items() if k not in SERVED_PARAMS})
+
+
+def fixture_path(directory, query, params=None):
+    return os.path.join(directory, f"{fixture_key(query, params)}.json")
+
+
+# Write (or extend) the fixture for a query with the articles of one response
+def write_fixture(directory, query, articles, params=None):
+    os.makedirs(directory, exist_ok=True)
+    path = fixture_path(directory, query, params)
+    fixture = {'query': query, 'params': {k: v for k, v in (params or {}).items() if k not in SERVED_PARAMS},
+               'articles': []}
+    if os.path.exists(path):
+        with open(path) as f:
+            fixture = json.load(f)
+    seen = {article.get('url') for article in fixture['articles']}
+    fixture['articles'].extend(a for a in articles if a.get('url') not in seen)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(fixture, f)
+    os.replace(tmp_path, path)
+
+
+class FixtureRecorder:
+    """Captures successful NewsAPI responses into a fixture directory.
+
+    Install it as data_collection.response_recorder; every page of a query is
+    merged into that query's fixture.
+    """
+
+    def __init__(self, directory=FIXTURE_DIR):
+        self.directory = directory
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    def record(self, params, data):
+        if data.get('status') != 'ok':
+            return
+        with self._lock:
+            write_fixture(self.directory, params['q'], data.get('articles', []), params)
+            self.recorded += 1
+
+
+class ReplayServer:
+    """Local HTTP stand-in for /v2/everything serving recorded fixtures.
+
+    Latency, an error rate and pagination are configurable, so collection
+    throughput can be measured reproducibly without network access. Queries
+    with no fixture get an empty result.
+    """
+
+    def __init__(self, directory=FIXTURE_DIR, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=429, page_size=100, max_results=None, seed=None):
+        self.directory = directory
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.page_size = page_size
+        self.max_results = max_results
+        self.requests = 0
+        self.errors = 0
+        self.misses = 0
+        self._random = random.Random(seed)
+        self._fixtures = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v2/everything"
+
+    def _load_fixture(self, query, params):
+        key = fixture_key(query, params)
+        with self._lock:
+            if key not in self._fixtures:
+                path = os.path.join(self.directory, f"{key}.json")
+                articles = None
+                if os.path.exists(path):
+                    with open(path) as f:
+                        articles = json.load(f)['articles']
+                self._fixtures[key] = articles
+            return self._fixtures[key]
+
+    # Status code and JSON body for one request
+    def respond(self, params):
+        with self._lock:
+            self.requests += 1
+            fail = self._random.random() < self.error_rate
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.errors += 1
+            return self.error_status, {'status': 'error', 'code': 'replayError',
+                                       'message': f"Injected HTTP {self.error_status}"}
+        query = params.get('q', '')
+        articles = self._load_fixture(query, params)
+        if articles is None:
+            with self._lock:
+                self.misses += 1
+            articles = []
+        if params.get('from'):
+            articles = [a for a in articles if (a.get('publishedAt') or '') >= params['from']]
+        if params.get('to'):
+            articles = [a for a in articles if (a.get('publishedAt') or '') <= params['to']]
+        page = max(1, int(params.get('page', 1)))
+        page_size = min(int(params.get('pageSize', self.page_size)), 100)
+        # Like the developer plan, refuse pages reaching past the result limit
+        if self.max_results is not None and page * page_size > self.max_results:
+            return 426, {'status': 'error', 'code': 'maximumResultsReached',
+                         'message': f"Results are limited to {self.max_results}"}
+        window = articles[(page - 1) * page_size:page * page_size]
+        return 200, {'status': 'ok', 'totalResults': len(articles), 'articles': window}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                params = dict(parse_qsl(urlsplit(self.path).query))
+                status, data = server.respond(params)
+                body = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if status == 429:
+                    self.send_header('Retry-After', '1')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self.requests, 'errors': self.errors, 'misses': self.misses}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record NewsAPI responses or replay them locally")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record = subparsers.add_parser('record', help="fetch queries from NewsAPI into fixtures")
+    record.add_argument('queries', nargs='+')
+    record.add_argument('--dir', default=FIXTURE_DIR)
+    record.add_argument('--max-articles', type=int, default=100)
+
+    serve = subparsers.add_parser('serve', help="serve fixtures as a local /v2/everything")
+    serve.add_argument('--dir', default=FIXTURE_DIR)
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--latency', type=float, default=0.0)
+    serve.add_argument('--jitter', type=float, default=0.0)
+    serve.add_argument('--error-rate', type=float, default=0.0)
+    serve.add_argument('--error-status', type=int, default=429)
+    serve.add_argument('--page-size', type=int, default=100)
+    serve.add_argument('--max-results', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        import data_collection
+        data_collection.response_recorder = FixtureRecorder(args.dir)
+        data_collection.article_fields = None  # Fixtures keep whole articles; replayed runs project them
+        api_key = data_collection.load_api_keys()['newsapi']
+        for query in args.queries:
+            count = sum(1 for _ in data_collection.iter_articles(query, api_key, max_articles=args.max_articles))
+            print(f"Recorded {count} articles for '{query}'")
+    else:
+        server = ReplayServer(args.dir, port=args.port, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, error_status=args.error_status,
+                              page_size=args.page_size, max_results=args.max_results)
+        print(f"Replaying {args.dir} at {server.url}")
+        print(f"Point the pipeline at it with NEWSAPI_BASE_URL=http://127.0.0.1:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+import threading
+
+# SpaCy model used by data collection and analysis
+MODEL_NAME = 'en_core_web_sm'
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+# Return the shared SpaCy pipeline, loading it on first use
+def get_nlp(name=MODEL_NAME):
+    nlp = _models.get(name)
+    if nlp is None:
+        with _models_lock:
+            nlp = _models.get(name)
+            if nlp is None:
+                import spacy  # Deferred so importing the pipeline modules stays cheap
+                nlp = _models[name] = spacy.load(name)
+    return nlp
+
+
+# Download the model if it is not installed yet (run once as a setup step)
+def download_model(name=MODEL_NAME):
+    import spacy.util
+    if spacy.util.is_package(name):
+        print(f"SpaCy model '{name}' is already installed")
+        return
+    subprocess.run([sys.executable, '-m', 'spacy', 'download', name], check=True)
+
+
+if __name__ == "__main__":
+    download_model(*sys.argv[1:2])
@@ -0,0 +1,110 @@
+import json
+import os
+
+PROFILE_STATE_PATH = os.path.join('output', 'profile_state.json')
+# Entity label feeding each competitor profile field
+PROFILE_LABELS = {'products': 'PRODUCT', 'market_trends': 'ORG'}
+
+
+# Profile fields of one article's entities: {field: sorted unique entity texts}
+def profile_entities(entities):
+    return {field: sorted(set(entities.get(label, []))) for field, label in PROFILE_LABELS.items()}
+
+
+class ProfileState:
+    """Entity counts behind competitor_profiles.json, kept between analysis runs.
+
+    Each analyzed article keeps the version of the text it was analyzed from
+    and the profile entities found in it; each competitor keeps the articles
+    counted into its profile and, per entity, how many of them mention it. A
+    profile lists the entities with a positive count, so adding, removing or
+    re-analyzing an article only touches that article's entities.
+    """
+
+    def __init__(self, model=None):
+        self.reset(model)
+
+    def reset(self, model):
+        self.model = model
+        self.articles = {}  # {article ID: {'version': [text key, page signature], field: entities}}
+        self.members = {}  # {competitor: set of article IDs}
+        self.counts = {}  # {competitor: {field: {entity: articles mentioning it}}}
+
+    @classmethod
+    def load(cls, path=PROFILE_STATE_PATH):
+        state = cls()
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            state.model = data['model']
+            state.articles = data['articles']
+            for competitor, entry in data['competitors'].items():
+                state.members[competitor] = set(entry['article_ids'])
+                state.counts[competitor] = entry['counts']
+        return state
+
+    def save(self, path=PROFILE_STATE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = {
+            'model': self.model,
+            'articles': self.articles,
+            'competitors': {competitor: {'article_ids': sorted(ids), 'counts': self.counts[competitor]}
+                            for competitor, ids in self.members.items()}
+        }
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(f"{path}.tmp", path)
+
+    # Version of the text an article was analyzed from, or None if it never was
+    def version(self, article_id):
+        entry = self.articles.get(article_id)
+        return entry['version'] if entry is not None else None
+
+    def _count(self, competitor, article_id, step):
+        entry = self.articles.get(article_id)
+        if entry is None:
+            return
+        for field in PROFILE_LABELS:
+            counts = self.counts[competitor][field]
+            for entity in entry[field]:
+                n = counts.get(entity, 0) + step
+                if n:
+                    counts[entity] = n
+                else:
+                    del counts[entity]
+
+    # Record an article's entities, moving the counts of the competitors that already count it
+    def set_article(self, article_id, version, entities):
+        counted_by = [competitor for competitor, ids in self.members.items() if article_id in ids]
+        for competitor in counted_by:
+            self._count(competitor, article_id, -1)
+        self.articles[article_id] = {'version': version, **profile_entities(entities)}
+        for competitor in counted_by:
+            self._count(competitor, article_id, 1)
+
+    # Make `article_ids` the articles counted into a competitor's profile
+    def set_members(self, competitor, article_ids):
+        ids = set(article_ids)
+        before = self.members.get(competitor, set())
+        self.counts.setdefault(competitor, {field: {} for field in PROFILE_LABELS})
+        for i in before - ids:
+            self._count(competitor, i, -1)
+        self.members[competitor] = ids
+        for i in ids - before:
+            self._count(competitor, i, 1)
+
+    def drop_competitor(self, competitor):
+        self.members.pop(competitor, None)
+        self.counts.pop(competitor, None)
+
+    # Forget the entities of articles no competitor counts any more
+    def prune(self):
+        counted = set().union(*self.members.values())
+        for i in [i for i in self.articles if i not in counted]:
+            del self.articles[i]
+
+    # Profiles in the competitor_profiles.json shape, for the given competitors in order
+    def profiles(self, competitors):
+        return {competitor: {field: sorted(self.counts[competitor][field]) for field in PROFILE_LABELS}
+                for competitor in competitors}
@@ -0,0 +1,66 @@
+import re
+
+NEWSAPI_MAX_QUERY_LENGTH = 500  # Characters /v2/everything accepts in q
+
+# Article fields searched when assigning a coalesced result back to names
+MATCH_FIELDS = ('title', 'description', 'content')
+
+
+# Boolean OR query matching any of the names as exact phrases
+def or_query(names):
+    return ' OR '.join(f'"{name.replace(chr(34), "")}"' for name in names)
+
+
+# Pack names into as few OR queries as fit the length limit; returns {query: [names]}
+def coalesce_queries(names, max_length=NEWSAPI_MAX_QUERY_LENGTH):
+    batches = []
+    current = []
+    for name in dict.fromkeys(names):
+        if current and len(or_query(current + [name])) > max_length:
+            batches.append(current)
+            current = []
+        current.append(name)
+    if current:
+        batches.append(current)
+    return {or_query(batch): batch for batch in batches}
+
+
+class NameMatcher:
+    """Finds which of many names occur in a text with one compiled regex.
+
+    Names match case-insensitively on word boundaries. Every name that occurs
+    is reported, including names overlapping another or inside a longer one:
+    "Samsung Electronics" yields both "Samsung Electronics" and "Samsung".
+    """
+
+    def __init__(self, names):
+        self.lookup = {name.casefold(): name for name in names}
+        alternatives = '|'.join(re.escape(name) for name in sorted(self.lookup, key=len, reverse=True))
+        # A lookahead consumes nothing, so the longest name starting at every position is found
+        self.pattern = re.compile(rf'(?<!\w)(?=({alternatives})(?!\w))', re.IGNORECASE)
+        # Names inside each name, itself included; they occur wherever it does
+        self.within = {key: {other for other in self.lookup
+                             if other in key and re.search(rf'(?<!\w){re.escape(other)}(?!\w)', key)}
+                       for key in self.lookup}
+
+    def _found(self, text):
+        return {m.casefold() for m in self.pattern.findall(text) if m.casefold() in self.lookup}
+
+    def names_in(self, text):
+        return {self.lookup[key] for found in self._found(text) for key in self.within[found]}
+
+
+# Split one coalesced NewsAPI response into a per-name response for each name
+def demultiplex(news_data, names):
+    if news_data.get('status') != 'ok':
+        return {name: news_data for name in names}
+    matcher = NameMatcher(names)
+    assigned = {name: [] for name in names}
+    for article in news_data.get('articles', []):
+        text = ' '.join(article.get(field) or '' for field in MATCH_FIELDS)
+        for name in matcher.names_in(text):
+            assigned[name].append(article)
+    return {
+        name: {'status': 'ok', 'totalResults': len(articles), 'articles': articles}
+        for name, articles in assigned.items()
+    }
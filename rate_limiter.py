@@ -0,0 +1,133 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Status codes worth retrying after a pause
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens per second.
+
+    A rate of None disables limiting.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    # Block until a token is available and return the seconds spent waiting
+    def acquire(self):
+        if self.rate is None:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+# Seconds to wait according to a Retry-After header, or None if absent/invalid
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Schedules HTTP calls through a token bucket with retry and backoff.
+
+    429 and 5xx responses, connection errors and timeouts are retried with
+    exponential backoff and full jitter. A Retry-After header pauses every
+    caller sharing the limiter, not just the one that received it.
+    """
+
+    def __init__(self, rate=None, capacity=1, max_retries=4, backoff_base=0.5, backoff_max=60.0):
+        self.bucket = TokenBucket(rate, capacity)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.throttled_responses = 0
+        self.throttled_seconds = 0.0  # Waiting on the token bucket or a shared pause
+        self.backoff_seconds = 0.0  # Sleeping between retries
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    # Block until the shared pause is over and a token is available
+    def wait_for_turn(self):
+        waited = 0.0
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+        waited += self.bucket.acquire()
+        with self._lock:
+            self.throttled_seconds += waited
+            self.requests += 1
+
+    # Call send() until it returns a non-retryable response or retries run out;
+    # acquired=True means the caller already waited for the first attempt's turn
+    def call(self, send, acquired=False):
+        attempt = 0
+        while True:
+            if attempt or not acquired:
+                self.wait_for_turn()
+            try:
+                response = send()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                delay = self._backoff(attempt, retry_after)
+                if response.status_code == 429:
+                    with self._lock:
+                        self.throttled_responses += 1
+                        if retry_after is not None:
+                            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            with self._lock:
+                self.retries += 1
+                self.backoff_seconds += delay
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'retries': self.retries,
+                'throttled_responses': self.throttled_responses,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+                'backoff_seconds': round(self.backoff_seconds, 3)
+            }
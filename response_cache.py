@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+
+import brotli
+
+# Default cache settings
+CACHE_DIR = os.path.join('cache', 'newsapi')
+CACHE_TTL = 6 * 60 * 60  # seconds
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Eviction frees space down to this fraction of the cap, so it does not run again on the next write
+CACHE_EVICT_TO = 0.9
+# Each entry starts with a format tag and its write time; the brotli-compressed JSON follows
+ENTRY_HEADER = struct.Struct('>4sd')
+ENTRY_FORMAT = b'RC01'
+
+
+# Build a stable cache key from a query and its request parameters
+def make_cache_key(query, params=None):
+    normalized = ' '.join(query.split()).casefold()
+    params = {k: v for k, v in (params or {}).items() if k not in ('q', 'apiKey')}
+    payload = json.dumps([normalized, sorted(params.items())], default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Brotli-compressed JSON responses on disk with a TTL and an LRU size cap.
+
+    Entries expire `ttl` seconds after the write time stored in their header.
+    Recency is tracked separately through each file's modification time,
+    which is refreshed on every hit, so eviction removes the least recently
+    used files. The directory is scanned only when a running byte total
+    crosses the cap; files are read, written and decompressed outside the
+    lock, so concurrent fetches do not queue behind one another.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = None  # Running size of the entries, counted on the first write
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json.br")
+
+    # Write time stored in an entry's header, or None for a file in another format
+    @staticmethod
+    def _written_at(path):
+        with open(path, 'rb') as f:
+            header = f.read(ENTRY_HEADER.size)
+        if len(header) < ENTRY_HEADER.size:
+            return None
+        tag, written_at = ENTRY_HEADER.unpack(header)
+        return written_at if tag == ENTRY_FORMAT else None
+
+    def _remove(self, path):
+        size = os.path.getsize(path)
+        os.remove(path)
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes -= size
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                blob = f.read()
+            tag, written_at = ENTRY_HEADER.unpack_from(blob) if len(blob) >= ENTRY_HEADER.size else (None, 0.0)
+            if tag != ENTRY_FORMAT or time.time() - written_at > self.ttl:
+                self._remove(path)
+                raise FileNotFoundError(path)
+            data = json.loads(brotli.decompress(blob[ENTRY_HEADER.size:]))
+            try:
+                os.utime(path)  # Mark as recently used; the TTL still counts from the write time
+            except FileNotFoundError:
+                pass  # Evicted meanwhile; the data read is still good
+        except (FileNotFoundError, ValueError, brotli.error):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def set(self, key, data):
+        blob = ENTRY_HEADER.pack(ENTRY_FORMAT, time.time()) + brotli.compress(
+            json.dumps(data).encode('utf-8'), quality=5)
+        path = self._path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            replaced = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced = 0
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan_bytes()
+            else:
+                self._bytes += len(blob) - replaced
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json.br'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Removed by a concurrent get
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    # Over the size cap: remove expired entries, then least recently used ones until down to
+    # CACHE_EVICT_TO of the cap. Called with the lock held; recounts the running total.
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        self._bytes = total
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * CACHE_EVICT_TO
+        # Expired entries are otherwise only dropped when read, so sweep them first
+        now = time.time()
+        live = []
+        for used_at, size, path in entries:
+            try:
+                written_at = self._written_at(path)
+                if written_at is None or now - written_at > self.ttl:
+                    os.remove(path)
+                    total -= size
+                    self.evictions += 1
+                else:
+                    live.append((used_at, size, path))
+            except FileNotFoundError:
+                total -= size
+        for _, size, path in sorted(live):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+
+    def clear(self):
+        with self._lock:
+            if os.path.isdir(self.directory):
+                for entry in os.scandir(self.directory):
+                    os.remove(entry.path)
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / total if total else 0.0
+            }
@@ -0,0 +1,300 @@
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from crawler import USER_AGENT, HTMLTextExtractor
+from query_coalescing import MATCH_FIELDS, NameMatcher
+
+FEED_TIMEOUT = (5, 20)  # (connect, read) seconds per feed
+ATOM = '{http://www.w3.org/2005/Atom}'
+DC_CREATOR = '{http://purl.org/dc/elements/1.1/}creator'
+CONTENT_ENCODED = '{http://purl.org/rss/1.0/modules/content/}encoded'
+LOCAL_EXTENSIONS = {'.json', '.txt', '.md', '.html', '.htm'}
+SOURCE_GRACE = 5  # Seconds past the deadline a source gets to return what it collected
+
+
+# Response for a query a source could not answer, in the NewsAPI error shape
+def error_response(code, message):
+    return {'status': 'error', 'code': code, 'message': message}
+
+
+def ok_response(articles):
+    return {'status': 'ok', 'totalResults': len(articles), 'articles': articles}
+
+
+# ISO 8601 UTC timestamp like NewsAPI's publishedAt, or None
+def iso_timestamp(value):
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = value.strip()
+        try:
+            value = parsedate_to_datetime(value)  # RSS (RFC 822)
+        except (TypeError, ValueError):
+            try:
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))  # Atom (RFC 3339)
+            except ValueError:
+                return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _html_text(markup):
+    if not markup:
+        return None
+    extractor = HTMLTextExtractor()
+    extractor.feed(markup)
+    extractor.close()
+    return ' '.join(extractor.text().split()) or None
+
+
+class Source:
+    """A place articles for competitor and keyword queries come from.
+
+    collect() returns {query: response} in the NewsAPI response shape
+    ({'status', 'totalResults', 'articles'}), so every source feeds the same
+    dedup and extraction path. Each source runs with its own worker limit
+    and returns by its deadline with the queries it answered by then.
+    """
+
+    name = 'source'
+
+    def __init__(self, max_workers=4, name=None):
+        self.max_workers = max_workers
+        if name:
+            self.name = name
+
+    def collect(self, competitor_names, keywords, deadline=None):
+        raise NotImplementedError
+
+
+class DocumentSource(Source):
+    """Source that reads all its documents up front and matches them to queries.
+
+    Every document is scanned once for every query name, with the same
+    word-bounded matching coalesced NewsAPI queries use.
+    """
+
+    # Articles in the NewsAPI article shape
+    def documents(self, deadline=None):
+        raise NotImplementedError
+
+    def collect(self, competitor_names, keywords, deadline=None):
+        queries = list(dict.fromkeys([*competitor_names, *keywords]))
+        if not queries:
+            return {}
+        matcher = NameMatcher(queries)
+        assigned = {query: [] for query in queries}
+        for article in self.documents(deadline):
+            text = ' '.join(article.get(field) or '' for field in MATCH_FIELDS)
+            for query in matcher.names_in(text):
+                assigned[query].append(article)
+        return {query: ok_response(articles) for query, articles in assigned.items()}
+
+
+# Articles from an RSS 2.0 or Atom document
+def parse_feed(content):
+    root = ET.fromstring(content)
+    articles = []
+    if root.tag == f"{ATOM}feed":
+        feed_title = (root.findtext(f"{ATOM}title") or '').strip()
+        for entry in root.iter(f"{ATOM}entry"):
+            links = entry.findall(f"{ATOM}link")
+            link = next((l for l in links if l.get('rel', 'alternate') == 'alternate'), links[0] if links else None)
+            articles.append({
+                'source': {'id': None, 'name': feed_title},
+                'author': entry.findtext(f"{ATOM}author/{ATOM}name"),
+                'title': (entry.findtext(f"{ATOM}title") or '').strip() or None,
+                'description': _html_text(entry.findtext(f"{ATOM}summary")),
+                'url': link.get('href') if link is not None else None,
+                'publishedAt': iso_timestamp(entry.findtext(f"{ATOM}published") or entry.findtext(f"{ATOM}updated")),
+                'content': _html_text(entry.findtext(f"{ATOM}content"))
+            })
+        return articles
+    channel = root.find('channel')
+    feed_title = (channel.findtext('title') if channel is not None else '') or ''
+    for item in root.iter('item'):
+        articles.append({
+            'source': {'id': None, 'name': feed_title.strip()},
+            'author': item.findtext('author') or item.findtext(DC_CREATOR),
+            'title': (item.findtext('title') or '').strip() or None,
+            'description': _html_text(item.findtext('description')),
+            'url': (item.findtext('link') or '').strip() or None,
+            'publishedAt': iso_timestamp(item.findtext('pubDate')),
+            'content': _html_text(item.findtext(CONTENT_ENCODED))
+        })
+    return articles
+
+
+class RSSSource(DocumentSource):
+    """RSS 2.0 and Atom feeds, fetched concurrently and matched to queries by name."""
+
+    name = 'rss'
+
+    def __init__(self, feeds, max_workers=4, timeout=FEED_TIMEOUT, name=None):
+        super().__init__(max_workers, name)
+        self.feeds = list(dict.fromkeys(feeds))
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.failed_feeds = []
+
+    def _fetch_feed(self, url):
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return parse_feed(response.content)
+        except (requests.RequestException, ET.ParseError) as e:
+            print(f"Feed {url} failed: {e}")
+            self.failed_feeds.append(url)
+            return []
+
+    def documents(self, deadline=None):
+        if not self.feeds:
+            return []
+        self.failed_feeds = []
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.feeds)))
+        futures = {url: pool.submit(self._fetch_feed, url) for url in self.feeds}
+        done, _ = wait(futures.values(), timeout=deadline)
+        pool.shutdown(wait=False, cancel_futures=True)
+        self.failed_feeds += [url for url, future in futures.items() if future not in done]
+        return [article for future in futures.values() if future in done for article in future.result()]
+
+
+# Articles stored in one local file
+def read_document(path):
+    path = Path(path)
+    suffix = path.suffix.lower()
+    published = iso_timestamp(datetime.fromtimestamp(path.stat().st_mtime, timezone.utc))
+    if suffix == '.json':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        # A saved NewsAPI response, a list of articles or a single article; articles
+        # without a URL are told apart by their content hash
+        articles = data.get('articles', [data]) if isinstance(data, dict) else data
+        return [{**article, 'publishedAt': article.get('publishedAt') or published}
+                for article in articles if isinstance(article, dict)]
+    text = path.read_text(encoding='utf-8', errors='replace')
+    if suffix in ('.html', '.htm'):
+        extractor = HTMLTextExtractor()
+        extractor.feed(text)
+        extractor.close()
+        title, content = ' '.join(extractor.title.split()), extractor.text()
+    else:
+        title, _, content = text.strip().partition('\n')
+        title = title.lstrip('# ').strip()
+    return [{
+        'source': {'id': None, 'name': 'Local files'},
+        'title': title or path.stem,
+        'description': None,
+        'url': path.resolve().as_uri(),
+        'publishedAt': published,
+        'content': content.strip()
+    }]
+
+
+class LocalDirectorySource(DocumentSource):
+    """Documents in a local directory: NewsAPI-style JSON, text, Markdown and HTML.
+
+    Handy for offline runs and for benchmarking the pipeline on large corpora.
+    """
+
+    name = 'local'
+
+    def __init__(self, directory, max_workers=8, name=None):
+        super().__init__(max_workers, name)
+        self.directory = directory
+        self.failed_files = []
+
+    def paths(self):
+        for root, _, files in os.walk(self.directory):
+            for file in sorted(files):
+                if os.path.splitext(file)[1].lower() in LOCAL_EXTENSIONS:
+                    yield os.path.join(root, file)
+
+    # An unreadable or malformed file is skipped, not the whole source
+    def _read_document(self, path):
+        try:
+            return read_document(path)
+        except (OSError, UnicodeError, json.JSONDecodeError) as e:
+            print(f"Document {path} skipped: {e}")
+            self.failed_files.append(path)
+            return []
+
+    def documents(self, deadline=None):
+        paths = list(self.paths())
+        self.failed_files = []
+        if not paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(paths))) as pool:
+            return [article for articles in pool.map(self._read_document, paths) for article in articles]
+
+
+# Run every source in parallel; returns ({source: {query: response}}, {source: timing report}).
+# Sources answer within `deadline` and get `grace` more to return, so the queries a source
+# completed in time are kept; only a source that overruns that too loses its results.
+def collect_from_sources(sources, competitor_names, keywords, deadline=None, grace=SOURCE_GRACE):
+    queries = list(dict.fromkeys([*competitor_names, *keywords]))
+    if not sources:
+        return {}, {}
+    # Results are keyed by source name, so two sources sharing one would silently replace each other
+    names = [source.name for source in sources]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate source names: {', '.join(duplicates)}; pass name= to tell them apart")
+
+    def run(source):
+        start = time.monotonic()
+        return source.collect(competitor_names, keywords, deadline=deadline), time.monotonic() - start
+
+    started = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix='source')
+    futures = {source.name: pool.submit(run, source) for source in sources}
+    done, _ = wait(futures.values(), timeout=None if deadline is None else deadline + grace)
+    pool.shutdown(wait=False, cancel_futures=True)
+    results, report = {}, {}
+    for name, future in futures.items():
+        seconds = time.monotonic() - started
+        if future not in done:
+            source_results = {query: error_response('deadlineExceeded', f"{name} missed the {deadline}s deadline")
+                              for query in queries}
+        elif future.exception() is not None:
+            # One failing source leaves the others' results intact
+            source_results = {query: error_response('sourceFailed', f"{name}: {future.exception()}")
+                              for query in queries}
+        else:
+            source_results, seconds = future.result()
+        results[name] = source_results
+        report[name] = {
+            'seconds': round(seconds, 3),
+            'articles': sum(len(r.get('articles', [])) for r in source_results.values()),
+            'failed_queries': {q: r.get('code') for q, r in source_results.items() if r.get('status') != 'ok'}
+        }
+    return results, report
+
+
+# One response per query combining the articles every source returned for it
+def merge_source_results(results, queries):
+    merged = {}
+    for query in queries:
+        responses = [source_results[query] for source_results in results.values() if query in source_results]
+        ok = [response for response in responses if response.get('status') == 'ok']
+        if ok:
+            merged[query] = {'status': 'ok',
+                             'totalResults': sum(response.get('totalResults', 0) for response in ok),
+                             'articles': [article for response in ok for article in response.get('articles', [])]}
+        else:
+            merged[query] = responses[0] if responses else ok_response([])
+    return merged
@@ -0,0 +1,89 @@
+import json
+import random
+
+import pytest
+
+import data_analysis
+import nlp_models
+from article_store import ArticleStore
+from doc_store import DocStore
+from entity_cache import EntityCache
+
+PRODUCTS = ['iPhone', 'Galaxy', 'Pixel', 'Surface', 'Kindle', 'Echo']
+SITE_PRODUCTS = ['Fire TV', 'Alexa']  # Only on the crawled website
+ORGS = ['Apple', 'Samsung', 'Google', 'Microsoft', 'Amazon', 'European Union']
+WORDS = ['launches', 'reports', 'new', 'sales', 'market', 'growth', 'in', 'the', 'quarter', 'review']
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    spacy = pytest.importorskip('spacy')
+    nlp = spacy.blank('en')
+    nlp.add_pipe('entity_ruler').add_patterns(
+        [{'label': 'PRODUCT', 'pattern': name} for name in PRODUCTS + SITE_PRODUCTS]
+        + [{'label': 'ORG', 'pattern': name} for name in ORGS])
+    monkeypatch.setitem(nlp_models._models, nlp_models.MODEL_NAME, nlp)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'output').mkdir()
+    monkeypatch.setattr(data_analysis, 'entity_cache', EntityCache(str(tmp_path / 'entities.db')))
+    monkeypatch.setattr(data_analysis, 'doc_store', DocStore(str(tmp_path / 'docs')))
+    return tmp_path
+
+
+def make_articles(n, seed=7):
+    rng = random.Random(seed)
+    sentence = lambda: ' '.join(rng.choice(WORDS + PRODUCTS + ORGS) for _ in range(12))
+    return {f"a{k:03d}": {'title': sentence(), 'description': sentence(), 'content': sentence(),
+                          'url': f"https://news.example/{k}"}
+            for k in range(n)}
+
+
+# Write a collection state, then check an incremental update and a full rebuild write the same file
+def run(workdir, articles, members, new_ids, pages=None):
+    with ArticleStore('output/articles.db') as store:
+        store.save_collection({}, {}, {i: articles[i] for ids in members.values() for i in ids}, replace=False)
+        if pages:
+            store.save_pages(pages)
+    organized = {name: {'article_ids': ids, 'new_article_ids': new_ids.get(name, [])} for name, ids in members.items()}
+    (workdir / 'output' / 'organized_details.json').write_text(json.dumps(organized))
+    data_analysis.analyze_data(n_process=1, incremental=True)
+    incremental = (workdir / 'competitor_profiles.json').read_text()
+    data_analysis.analyze_data(n_process=1)
+    full = (workdir / 'competitor_profiles.json').read_text()
+    assert incremental == full
+    return json.loads(full)
+
+
+def test_incremental_profiles_match_full_rebuild(workdir):
+    articles = make_articles(150)
+    ids = list(articles)
+    rng = random.Random(3)
+    members = {name: rng.sample(ids[:100], 40) for name in ('Apple', 'Samsung', 'Google')}
+    profiles = run(workdir, articles, members, members)
+    assert set(profiles) == set(members) and all(profile['products'] for profile in profiles.values())
+
+    # New articles for one competitor
+    members['Apple'] = members['Apple'] + ids[100:115]
+    run(workdir, articles, members, {'Apple': ids[100:115]})
+
+    # Articles dropped from a profile
+    members['Samsung'] = members['Samsung'][15:]
+    run(workdir, articles, members, {})
+
+    # A competitor added and one removed
+    members['Amazon'] = ids[115:140]
+    del members['Google']
+    assert set(run(workdir, articles, members, {'Amazon': ids[115:140]})) == {'Apple', 'Samsung', 'Amazon'}
+
+    # A competitor website crawled, then re-crawled with new text but no new-article flag
+    articles['site'] = {'title': 'Amazon', 'url': 'https://amazon.example/'}
+    members['Amazon'].append('site')
+    page = {'etag': '1', 'text': 'Amazon Fire TV'}
+    profiles = run(workdir, articles, members, {'Amazon': ['site']}, {'https://amazon.example/': page})
+    assert 'Fire TV' in profiles['Amazon']['products']
+    page = {'etag': '2', 'text': 'Amazon Alexa review'}
+    profiles = run(workdir, articles, members, {}, {'https://amazon.example/': page})
+    assert 'Alexa' in profiles['Amazon']['products'] and 'Fire TV' not in profiles['Amazon']['products']
+
+    # Nothing changed
+    run(workdir, articles, members, {})
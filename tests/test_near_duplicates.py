@@ -0,0 +1,98 @@
+import random
+
+import numpy as np
+
+from near_duplicates import SIMILARITY_THRESHOLD, cluster_near_duplicates, fingerprint
+
+OUTLETS = ['Reuters', 'AP', 'Yahoo News', 'MSN', 'Business Insider', 'Local Paper']
+
+
+# Stories syndicated to several outlets: each copy adds the outlet's name to the headline
+def syndicated_corpus(n_stories=40, copies=(1, 6), seed=5):
+    rng = random.Random(seed)
+    articles, expected = {}, []
+    for story in range(n_stories):
+        words = [f"s{story}w{k}" for k in range(14)]
+        title, description = ' '.join(words[:6]), ' '.join(words[6:])
+        group = []
+        for copy in range(rng.randint(*copies)):
+            i = f"story{story}-copy{copy}"
+            articles[i] = {'title': f"{title} - {OUTLETS[copy % len(OUTLETS)]}" if copy else title,
+                           'description': description}
+            group.append(i)
+        expected.append(group)
+    order = list(articles)
+    rng.shuffle(order)
+    return {i: articles[i] for i in order}, expected
+
+
+# Clusters from comparing every pair: the result LSH has to reproduce for well separated stories
+def pairwise_clusters(articles, threshold=SIMILARITY_THRESHOLD):
+    ids = list(articles)
+    signatures = [fingerprint(articles[i]) for i in ids]
+    parent = list(range(len(ids)))
+
+    def find(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    for a in range(len(ids)):
+        for b in range(a + 1, len(ids)):
+            if np.mean(signatures[a] == signatures[b]) >= threshold:
+                ra, rb = find(a), find(b)
+                parent[max(ra, rb)] = min(ra, rb)
+    clusters = {}
+    for n, i in enumerate(ids):
+        clusters.setdefault(ids[find(n)], []).append(i)
+    return clusters
+
+
+def as_groups(clusters):
+    return sorted(sorted(members) for members in clusters.values())
+
+
+def test_syndicated_copies_cluster_by_story():
+    articles, expected = syndicated_corpus()
+    clusters = cluster_near_duplicates(articles)
+    assert as_groups(clusters) == sorted(sorted(group) for group in expected)
+    assert clusters == pairwise_clusters(articles)
+    order = list(articles)
+    for representative, members in clusters.items():
+        # The first copy in input order represents the story
+        assert representative == members[0] == min(members, key=order.index)
+
+
+def test_large_syndication_stays_one_cluster():
+    articles, _ = syndicated_corpus(n_stories=3, copies=(1, 1))
+    story = articles['story0-copy0']
+    for copy in range(1, 2000):
+        articles[f"story0-extra{copy}"] = {**story, 'title': f"{story['title']} - outlet {copy % 7}"}
+    clusters = cluster_near_duplicates(articles)
+    assert len(clusters) == 3
+    assert len(clusters['story0-copy0']) == 2000
+
+
+def test_articles_without_text_stay_alone():
+    articles = {'a': {'title': 'Same headline here'}, 'b': {'title': ''}, 'c': {}, 'd': {'title': 'Same headline here'}}
+    assert cluster_near_duplicates(articles) == {'a': ['a', 'd'], 'b': ['b'], 'c': ['c']}
+
+
+# New articles clustered against an earlier run's representatives end up where a single run puts them
+def test_known_articles_match_one_run():
+    articles, _ = syndicated_corpus(seed=11)
+    ids = list(articles)
+    earlier = {i: articles[i] for i in ids[:len(ids) // 2]}
+    known = {representative: fingerprint(articles[representative]) for representative in cluster_near_duplicates(earlier)}
+    later = {i: articles[i] for i in ids[len(ids) // 2:]}
+    clusters = cluster_near_duplicates(later, known=known)
+
+    single_run = cluster_near_duplicates(articles)
+    story = {member: representative for representative, members in single_run.items() for member in members}
+    for representative, members in clusters.items():
+        assert {story[member] for member in members} == {story[representative]}
+    # Copies of a story seen earlier join its stored representative
+    for i in later:
+        first_seen = story[i]
+        if first_seen in known:
+            assert i in clusters[first_seen]
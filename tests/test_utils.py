@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from utils import iter_json_items, save_json_stream
+
+DATA = {
+    'ints': [0, 7, -42, 1234567890, 10 ** 30],
+    'floats': [0.5, -3.25, 1e-09, 6.02e+23, -1.5e-300, 12345.6789],
+    'number': 98765.4321e-3,
+    'plain': 123456789,
+    'strings': ['', 'a "quoted" \\ word', 'tab\tnew\nline', 'unicode é ü 漢字 🚀', '{"not": "json"}'],
+    'literals': [True, False, None],
+    'nested': {'list': [[], {}, [1, [2, [3.5e2]]]], 'empty': {}},
+    'last': -0.001
+}
+
+
+@pytest.fixture(params=['compact', 'indented', 'streamed'])
+def json_file(request, tmp_path):
+    path = tmp_path / 'data.json'
+    if request.param == 'streamed':
+        save_json_stream(DATA.items(), path)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(DATA, f, indent=None if request.param == 'compact' else 4, separators=(',', ':')
+                      if request.param == 'compact' else None)
+    return path
+
+
+# Every chunk size cuts the file somewhere else, including inside each number
+def test_round_trip_across_chunk_sizes(json_file):
+    expected = list(json.loads(json_file.read_text(encoding='utf-8')).items())
+    for chunk_size in range(1, 40):
+        assert list(iter_json_items(json_file, chunk_size=chunk_size)) == expected, chunk_size
+
+
+@pytest.mark.parametrize('number', ['12.5', '-7', '1e5', '2.5E-3', '100000', '-0.125e+10'])
+def test_number_cut_at_every_offset(tmp_path, number):
+    path = tmp_path / 'number.json'
+    text = f'{{"n": {number}, "m": [{number}]}}'
+    path.write_text(text)
+    for chunk_size in range(1, len(text) + 1):
+        assert dict(iter_json_items(path, chunk_size=chunk_size)) == json.loads(text), chunk_size
+
+
+def test_empty_object(tmp_path):
+    path = tmp_path / 'empty.json'
+    path.write_text(' { } ')
+    assert list(iter_json_items(path, chunk_size=1)) == []
+
+
+def test_not_an_object(tmp_path):
+    path = tmp_path / 'list.json'
+    path.write_text('[1, 2]')
+    with pytest.raises(ValueError):
+        list(iter_json_items(path))
@@ -9,10 +9,90 @@ def load_json(filename):
         return json.load(file)
 
 def save_json(data, filename):
-    """Save data to a JSON file."""
+    """Save data to a JSON file, writing top-level objects one item at a time."""
+    if isinstance(data, dict):
+        save_json_stream(data.items(), filename)
+        return
     with open(filename, 'w') as file:
         json.dump(data, file, indent=4)
 
+def save_json_stream(items, filename, indent=4):
+    """Write (key, value) pairs from any iterable as a JSON object, one item at a time.
+
+    The output matches json.dump(dict(items), indent=indent), but only one
+    value is held in memory at a time.
+    """
+    pad = ' ' * indent
+    with open(filename, 'w') as file:
+        file.write('{')
+        first = True
+        for key, value in items:
+            body = json.dumps(value, indent=indent).replace('\n', '\n' + pad)
+            file.write(f"{'' if first else ','}\n{pad}{json.dumps(str(key))}: {body}")
+            first = False
+        file.write('}' if first else '\n}')
+
+_NUMBER_CHARS = '0123456789+-.eE'
+
+def iter_json_items(filename, chunk_size=1 << 16):
+    """Lazily yield the (key, value) pairs of a file holding one JSON object."""
+    decoder = json.JSONDecoder()
+    with open(filename, 'r') as file:
+        buffer, pos, eof = '', 0, False
+
+        def read_more(size):
+            nonlocal buffer, pos, eof
+            chunk = file.read(size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                read_more(chunk_size)
+
+        def expect(chars):
+            nonlocal pos
+            skip_whitespace()
+            if pos >= len(buffer) or buffer[pos] not in chars:
+                raise ValueError(f"Expected one of {chars!r} at offset {pos} of {filename}")
+            pos += 1
+            return buffer[pos - 1]
+
+        def decode():
+            nonlocal pos
+            skip_whitespace()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    # A number cut at the buffer edge may decode short ("12." as 12) and continue
+                    # in the next chunk, so read on while only number characters follow it
+                    cut = (isinstance(value, (int, float)) and not isinstance(value, bool)
+                           and not buffer[end:].lstrip(_NUMBER_CHARS))
+                    if eof or not cut:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                read_more(max(chunk_size, len(buffer) - pos))  # Grow geometrically for large values
+
+        expect('{')
+        skip_whitespace()
+        if buffer[pos:pos + 1] == '}':
+            return
+        while True:
+            key = decode()
+            expect(':')
+            yield key, decode()
+            if expect(',}') == '}':
+                return
+
 def create_directory(directory):
     """Create a directory if it does not exist."""
     if not os.path.exists(directory):